@@ -0,0 +1,129 @@
+"""
+Keyset pagination and streaming for list endpoints.
+
+Pages are read with column-projected queries ordered by primary key
+(`WHERE id > :last_id ORDER BY id LIMIT n`), so every page costs the same
+however deep it is and no ORM objects are built. The list body stays a
+plain JSON array; the cursor of the next page travels in the X-Next-Cursor
+header. Full dumps can be streamed as NDJSON, one batch in memory at a time.
+Each helper has an async variant for AsyncSession. JSON is encoded with
+orjson when it is installed.
+"""
+import base64
+import json
+
+from fastapi import HTTPException
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import select
+
+from utils.constants import API_STREAM_BATCH_SIZE
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard library encoder
+    orjson = None
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_cursor(last_id) -> str:
+    return base64.urlsafe_b64encode(dumps({"id": last_id})).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """Last id of the previous page, or None for the first page."""
+    if not cursor:
+        return None
+    try:
+        last_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id
+
+
+def _page_query(columns, key_column, filters, after_id, limit):
+    q = select(*columns).where(*filters)
+    if after_id is not None:
+        q = q.where(key_column > after_id)
+    return q.order_by(key_column).limit(limit)
+
+
+def fetch_page(db, columns, key_column, filters=(), cursor=None, limit=100):
+    """
+    One page of rows as dicts, plus the cursor of the next page (None on the last page).
+    `columns` must include `key_column`.
+    """
+    rows = db.execute(_page_query(columns, key_column, filters, decode_cursor(cursor), limit + 1)).mappings().all()
+    return _page_items(rows, key_column, limit)
+
+
+async def fetch_page_async(db, columns, key_column, filters=(), cursor=None, limit=100):
+    """fetch_page for an AsyncSession."""
+    result = await db.execute(_page_query(columns, key_column, filters, decode_cursor(cursor), limit + 1))
+    return _page_items(result.mappings().all(), key_column, limit)
+
+
+def _page_items(rows, key_column, limit):
+    next_cursor = encode_cursor(rows[limit - 1][key_column.key]) if len(rows) > limit else None
+    return [dict(r) for r in rows[:limit]], next_cursor
+
+
+def page_response(items, next_cursor):
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return Response(content=dumps(items), media_type="application/json", headers=headers)
+
+
+def stream_ndjson(session_factory, columns, key_column, filters=(), cursor=None, batch_size=API_STREAM_BATCH_SIZE):
+    """
+    Stream every row after `cursor` as NDJSON. The generator owns its own
+    session, since it outlives the request handler.
+    """
+    start_after = decode_cursor(cursor)  # reject a bad cursor before streaming starts
+
+    def generate():
+        after_id = start_after
+        db = session_factory()
+        try:
+            while True:
+                rows = db.execute(_page_query(columns, key_column, filters, after_id, batch_size)).mappings().all()
+                if not rows:
+                    break
+                yield b"".join(dumps(dict(r)) + b"\n" for r in rows)
+                if len(rows) < batch_size:
+                    break
+                after_id = rows[-1][key_column.key]
+                db.rollback()  # end the read transaction between batches
+        finally:
+            db.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+def stream_ndjson_async(session_factory, columns, key_column, filters=(), cursor=None,
+                        batch_size=API_STREAM_BATCH_SIZE):
+    """stream_ndjson with an async session factory."""
+    start_after = decode_cursor(cursor)
+
+    async def generate():
+        after_id = start_after
+        async with session_factory() as db:
+            while True:
+                result = await db.execute(_page_query(columns, key_column, filters, after_id, batch_size))
+                rows = result.mappings().all()
+                if not rows:
+                    break
+                yield b"".join(dumps(dict(r)) + b"\n" for r in rows)
+                if len(rows) < batch_size:
+                    break
+                after_id = rows[-1][key_column.key]
+                await db.rollback()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -1,18 +1,25 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from models.db import SessionLocal
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.async_db import AsyncSessionLocal, get_async_db
 from models.business_domain import BusinessDomain
+from api.pagination import fetch_page_async, page_response, stream_ndjson_async
+from utils.constants import API_PAGE_SIZE, API_MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/business-domain", tags=["Business Domains"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+DOMAIN_COLUMNS = list(BusinessDomain.__table__.columns)
 
 @router.get("/")
-def get_business_domains(db: Session = Depends(get_db)):
-    domains = db.query(BusinessDomain).all()
-    return domains
+async def get_business_domains(
+    cursor: Optional[str] = None,
+    limit: int = Query(API_PAGE_SIZE, ge=1, le=API_MAX_PAGE_SIZE),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Business domains in id order, paginated like the glossary list."""
+    if format == "ndjson":
+        return stream_ndjson_async(AsyncSessionLocal, DOMAIN_COLUMNS, BusinessDomain.id, cursor=cursor)
+    items, next_cursor = await fetch_page_async(db, DOMAIN_COLUMNS, BusinessDomain.id, cursor=cursor, limit=limit)
+    return page_response(items, next_cursor)
@@ -1,30 +1,40 @@
 # api/business_glossary.py
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from models.db import SessionLocal
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.async_db import AsyncSessionLocal, get_async_db
 from models.business_term import BusinessTerm
+from api.pagination import fetch_page_async, page_response, stream_ndjson_async
+from utils.constants import API_PAGE_SIZE, API_MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/business-glossary", tags=["Business Glossary"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Columns returned by the list endpoint
+TERM_COLUMNS = [
+    BusinessTerm.id,
+    BusinessTerm.term,
+    BusinessTerm.term_context,
+    BusinessTerm.business_domain,
+    BusinessTerm.term_definition,
+    BusinessTerm.synonyms,
+    BusinessTerm.confidence_score,
+]
 
 @router.get("/")
-def get_business_terms(db: Session = Depends(get_db)):
-    terms = db.query(BusinessTerm).filter(BusinessTerm.is_active == False).all()
-    return [
-        {
-            "id": t.id,
-            "term": t.term,
-            "term_context": t.term_context,
-            "business_domain": t.business_domain,
-            "term_definition": t.term_definition,
-            "synonyms": t.synonyms,
-            "confidence_score": t.confidence_score,
-        }
-        for t in terms
-    ]
+async def get_business_terms(
+    cursor: Optional[str] = None,
+    limit: int = Query(API_PAGE_SIZE, ge=1, le=API_MAX_PAGE_SIZE),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Candidate (inactive) terms in id order, one page per request; the next
+    page's cursor is in the X-Next-Cursor header. format=ndjson streams
+    every remaining term instead.
+    """
+    filters = [BusinessTerm.is_active == False]
+    if format == "ndjson":
+        return stream_ndjson_async(AsyncSessionLocal, TERM_COLUMNS, BusinessTerm.id, filters, cursor)
+    items, next_cursor = await fetch_page_async(db, TERM_COLUMNS, BusinessTerm.id, filters, cursor, limit)
+    return page_response(items, next_cursor)
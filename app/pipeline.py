@@ -1,20 +1,31 @@
-from ingestion.document_reader import read_and_prepare_document
-from preprocessing.text_preprocessor import preprocess_text
+import os
+
+from ingestion.document_reader import iter_prepared_paragraphs
+from preprocessing.text_preprocessor import preprocess_paragraph_stream
+from preprocessing.corpus_tfidf import DocumentFrequencyStore
 from preprocessing.text_preprocessor import summarize_preprocessing
 from extraction.term_selector import extract_terms, summarize_term_extraction
 from enrichment.context_mapper import enrich_terms, summerize_enriched_terms
 from glossary.glossary_builder import save_to_glossary
+from utils.embedding_cache import get_embedding_cache_stats
+from models.db import ScopedSession
 
 
 def run_pipeline(input_file="documents/Retail-Lending_BRD.docx"):
-    text = read_and_prepare_document(input_file)
-    
-    #print(text[:1000])  # print first 1000 characters
-    preprocessed_candidates = preprocess_text(text)
-    #summarize_preprocessing(preprocessed_candidates)
-    terms = extract_terms(preprocessed_candidates)
-    #summarize_term_extraction(terms)
-    enriched = enrich_terms(terms)
-    summerize_enriched_terms(enriched)
-    save_to_glossary(enriched)
-    print("✅ Extraction completed and glossary updated.")
+    try:
+        # Paragraphs are streamed from the reader into preprocessing
+        paragraphs = iter_prepared_paragraphs(input_file)
+        preprocessed_candidates = preprocess_paragraph_stream(paragraphs, df_store=DocumentFrequencyStore(),
+                                                              source=os.path.abspath(input_file))
+        #summarize_preprocessing(preprocessed_candidates)
+        terms = extract_terms(preprocessed_candidates)
+        #summarize_term_extraction(terms)
+        enriched = enrich_terms(terms)
+        summerize_enriched_terms(enriched)
+        save_to_glossary(enriched)
+        for stats in get_embedding_cache_stats():
+            print(f"Embedding cache: {stats}")
+        print("✅ Extraction completed and glossary updated.")
+    finally:
+        # Return this thread's repository session to the pool
+        ScopedSession.remove()
@@ -0,0 +1,126 @@
+"""
+Benchmark: glossary page reads through the sync and the async data access.
+
+    python -m benchmarks.bench_db_async [--rows 20000] [--clients 1000] [--query-delay 0.02]
+
+Fills a temporary SQLite database, then has --clients concurrent clients read
+one glossary page each, twice: through a sync session run in a worker
+threadpool of --threads threads (how FastAPI runs sync routes), and through
+an async session on the event loop (aiosqlite). Both engines get a pool of
+--pool-size connections. --query-delay adds a simulated server-side wait to
+every request, standing in for a slow database. Reports wall time,
+throughput and client latency percentiles for each path.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import anyio
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from api.pagination import fetch_page, fetch_page_async
+from api.routes.glossary_router import TERM_COLUMNS
+from models.async_db import create_async_db_engine
+from models.business_term import Base, BusinessTerm
+from models.db import create_db_engine, get_pool_stats
+
+
+def _register_sleep(dbapi_connection, _):
+    # sleep_ms(ms): blocks the connection for ms milliseconds, like a slow query
+    dbapi_connection.create_function("sleep_ms", 1, lambda ms: time.sleep(ms / 1000) or 0)
+
+
+def fill(engine, rows):
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(BusinessTerm), [
+            {"term": f"loan product {i}", "term_definition": f"Definition {i}", "business_domain": "Retail Lending",
+             "term_context": {"original_sentence": f"The loan product {i} is offered."}, "is_active": False}
+            for i in range(rows)
+        ])
+
+
+def percentiles(latencies):
+    ordered = sorted(latencies)
+    pick = lambda p: ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+    return {f"p{p}": round(1000 * pick(p), 1) for p in (50, 95, 99)}
+
+
+async def run_sync(engine, clients, threads, limit, delay_ms):
+    Session = sessionmaker(bind=engine)
+    limiter = anyio.CapacityLimiter(threads)
+    filters = [BusinessTerm.is_active == False]
+
+    def handle():
+        with Session() as db:
+            if delay_ms:
+                db.execute(select(func.sleep_ms(delay_ms)))
+            return fetch_page(db, TERM_COLUMNS, BusinessTerm.id, filters, None, limit)
+
+    async def client():
+        start = time.perf_counter()
+        await anyio.to_thread.run_sync(handle, limiter=limiter)
+        return time.perf_counter() - start
+
+    return await asyncio.gather(*(client() for _ in range(clients)))
+
+
+async def run_async(engine, clients, limit, delay_ms):
+    Session = async_sessionmaker(engine)
+    filters = [BusinessTerm.is_active == False]
+
+    async def client():
+        start = time.perf_counter()
+        async with Session() as db:
+            if delay_ms:
+                await db.execute(select(func.sleep_ms(delay_ms)))
+            await fetch_page_async(db, TERM_COLUMNS, BusinessTerm.id, filters, None, limit)
+        return time.perf_counter() - start
+
+    return await asyncio.gather(*(client() for _ in range(clients)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=100, help="rows per page")
+    parser.add_argument("--query-delay", type=float, default=0.02, help="simulated seconds per query")
+    parser.add_argument("--pool-size", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=40, help="worker threads for the sync path")
+    args = parser.parse_args()
+    delay_ms = int(args.query_delay * 1000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'glossary.db')}"
+        sync_engine = create_db_engine(url, pool_size=args.pool_size, max_overflow=0, pool_timeout=300)
+        async_engine = create_async_db_engine(url, pool_size=args.pool_size, max_overflow=0, pool_timeout=300)
+        event.listen(sync_engine, "connect", _register_sleep)
+        event.listen(async_engine.sync_engine, "connect", _register_sleep)
+        fill(sync_engine, args.rows)
+
+        for label in ("sync", "async"):
+            start = time.perf_counter()
+            if label == "sync":
+                latencies = asyncio.run(run_sync(sync_engine, args.clients, args.threads, args.limit, delay_ms))
+                pool = get_pool_stats(sync_engine)
+            else:
+                async def measure():
+                    try:
+                        return await run_async(async_engine, args.clients, args.limit, delay_ms)
+                    finally:
+                        await async_engine.dispose()
+                latencies = asyncio.run(measure())
+                pool = get_pool_stats(async_engine.sync_engine)
+            seconds = time.perf_counter() - start
+            print(f"{label:>5}: {seconds:.2f}s, {args.clients / seconds:.0f} req/s, latency ms {percentiles(latencies)}, "
+                  f"pool wait ms p95 {pool['wait_ms_p95']}")
+        sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: enrichment stage offline, with the deterministic stub provider.
+
+    python -m benchmarks.bench_enrichment [--terms 500] [--latency 0.5] [--edited 0.1]
+
+Runs the stub enricher on synthetic terms with a cold LLM cache, again on
+the same terms (warm cache), and on a copy with a share of the contexts
+edited, reporting wall time and cache hit rate for each run. Then routes
+the terms to a stub with a slow tail (--slow-share of requests take
+--slow-latency), with and without hedging to a second stub.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from enrichment.llm_cache import LLMCache
+from enrichment.router import EnrichmentRouter
+from enrichment.stub_enricher import StubEnricher
+
+
+def make_terms(n):
+    return [
+        {
+            "term": f"loan product {i}",
+            "domain_name": "Retail Lending",
+            "contexts": [{"original_sentence": f"The loan product {i} is offered to eligible customers."}],
+        }
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--terms", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated seconds per request")
+    parser.add_argument("--edited", type=float, default=0.1, help="share of terms whose context changes")
+    parser.add_argument("--slow-share", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=5.0)
+    args = parser.parse_args()
+
+    terms = make_terms(args.terms)
+    n_edited = int(len(terms) * args.edited)
+    edited = [
+        {**t, "contexts": [{"original_sentence": t["contexts"][0]["original_sentence"] + " Revised."}]}
+        if i < n_edited else t
+        for i, t in enumerate(terms)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, batch in (("cold", terms), ("warm", terms), (f"{args.edited:.0%} edited", edited)):
+            cache = LLMCache(os.path.join(tmp, "llm_cache.sqlite"))
+            start = time.perf_counter()
+            router = EnrichmentRouter(StubEnricher(latency=args.latency))
+            asyncio.run(router.enrich_terms(batch, batch_token_budget=0, cache=cache))
+            print(f"{label:>12}: {time.perf_counter() - start:.2f}s, cache {cache.stats()}")
+
+        for hedge_percentile in (0, 95):
+            rnd = random.Random(0)
+            primary = StubEnricher(latency=lambda: args.slow_latency if rnd.random() < args.slow_share
+                                   else args.latency)
+            secondary = StubEnricher(model="stub-hedge", latency=args.latency)
+            router = EnrichmentRouter(primary, secondary, hedge_percentile=hedge_percentile)
+            cache = LLMCache(os.path.join(tmp, f"routed_{hedge_percentile}.sqlite"))
+            start = time.perf_counter()
+            asyncio.run(router.enrich_terms(terms, batch_token_budget=0, cache=cache))
+            label = f"hedge p{hedge_percentile:g}" if hedge_percentile else "no hedging"
+            print(f"{label:>12}: {time.perf_counter() - start:.2f}s, hedged {router.hedged}, "
+                  f"won {router.hedges_won}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: indexed remove_redundant_phrases vs the original pairwise loop.
+
+    python -m benchmarks.bench_redundant_phrases [--sizes 10000 50000 100000 200000]
+
+Builds synthetic 2-3-gram vocabularies like the TF-IDF analyzer produces,
+checks both implementations agree on a small vocabulary, then times the
+indexed version on each size (the pairwise loop only on sizes up to
+--legacy-max, since it is quadratic).
+"""
+import argparse
+import itertools
+import random
+import time
+
+from preprocessing.statistical_scoring import remove_redundant_phrases
+
+
+def legacy_remove_redundant_phrases(scored_phrases):
+    """The original O(n^2) implementation."""
+    filtered = []
+    phrases = list(scored_phrases.keys())
+
+    for i, phrase in enumerate(phrases):
+        if not any(
+            phrase in other and phrase != other
+            for j, other in enumerate(phrases)
+            if j != i
+        ):
+            filtered.append(phrase)
+    return {p: scored_phrases[p] for p in filtered}
+
+
+def make_vocabulary(size, seed=0):
+    rnd = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    # Zipf-like word frequencies over a vocabulary that grows with the size
+    words = ["".join(rnd.choice(letters) for _ in range(rnd.randint(3, 11))) for _ in range(max(200, size // 5))]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(words))))
+    vocabulary = {}
+    while len(vocabulary) < size:
+        for _ in range(size - len(vocabulary)):
+            phrase = " ".join(rnd.choices(words, cum_weights=cum_weights, k=rnd.choice((2, 2, 3))))
+            vocabulary[phrase] = rnd.random()
+    return vocabulary
+
+
+def timed(fn, arg):
+    start = time.perf_counter()
+    result = fn(arg)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000, 200000])
+    parser.add_argument("--legacy-max", type=int, default=10000)
+    args = parser.parse_args()
+
+    sample = make_vocabulary(3000, seed=1)
+    assert remove_redundant_phrases(sample) == legacy_remove_redundant_phrases(sample), "results differ"
+
+    print(f"{'phrases':>9} {'indexed':>10} {'pairwise':>10} {'kept':>9}")
+    for size in args.sizes:
+        vocabulary = make_vocabulary(size)
+        seconds, kept = timed(remove_redundant_phrases, vocabulary)
+        legacy = "-"
+        if size <= args.legacy_max:
+            legacy_seconds, legacy_kept = timed(legacy_remove_redundant_phrases, vocabulary)
+            assert legacy_kept == kept, "results differ"
+            legacy = f"{legacy_seconds:.2f}s"
+        print(f"{size:>9} {seconds:>9.2f}s {legacy:>10} {len(kept):>9}")
+
+
+if __name__ == "__main__":
+    main()
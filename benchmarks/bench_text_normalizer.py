@@ -0,0 +1,108 @@
+"""
+Micro-benchmark: compiled TextNormalizer vs the original multi-pass clean_text.
+
+    python -m benchmarks.bench_text_normalizer [--mb 5] [--noise 0.05] [--repeat 3]
+
+Reports throughput in MB/s for whole-document and per-paragraph (streaming)
+normalization, and checks both implementations produce the same output.
+"""
+import argparse
+import random
+import re
+import time
+
+from ingestion.text_normalizer import clean_text_normalizer
+
+
+def legacy_clean_text(raw_text: str) -> str:
+    """The original ingestion.document_reader.clean_text (15 uncompiled passes)."""
+    text = raw_text or ""
+    text = text.strip()
+
+    header_footer_patterns = [
+        r'page\s*\d+(\s*of\s*\d+)?',
+        r'\bconfidential\b',
+        r'\bbrd\b', r'\bsrs\b',
+        r'\bversion\s*\d+(\.\d+)?',
+        r'copyright\s*\d{4}',
+    ]
+    for pattern in header_footer_patterns:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+
+    text = re.sub(r'http\S+|www\.\S+', '', text)
+    text = re.sub(r'\S+@\S+', '', text)
+    text = re.sub(r'[A-Za-z]:\\[^\\\s]+', '', text)
+
+    text = re.sub(r'\b\d{1,4}\b', '', text)
+    text = re.sub(r'\b\d+[/-]\d+[/-]?\d*\b', '', text)
+
+    text = re.sub(r'[^a-zA-Z0-9\s.,%-]', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+
+    text = re.sub(r'\s([?.!,:;])', r'\1', text)
+    text = re.sub(r'([?.!,:;])\1+', r'\1', text)
+
+    return text.strip()
+
+
+WORDS = (
+    "loan application customer credit officer approval collateral mortgage interest rate "
+    "repayment schedule branch disbursement limit overdraft account KYC AML risk score"
+).split()
+NOISE = [
+    "Page 3 of 12", "CONFIDENTIAL", "BRD", "Version 2.1", "Copyright 2024",
+    "https://bank.example.com/docs", "ops@bank.example.com", r"C:\Shared\BRD",
+    "2017 20 03", "12/05/2024", "#", "**", "(", ")", "→", "!!", "...", ",,", "15%", "Lãi suất",
+]
+
+
+def make_document(size_mb, noise=0.05, seed=0):
+    rnd = random.Random(seed)
+    paragraphs = []
+    size = 0
+    while size < size_mb * 2**20:
+        parts = [rnd.choice(WORDS) if rnd.random() > noise else rnd.choice(NOISE) for _ in range(rnd.randint(20, 80))]
+        paragraph = " ".join(parts) + "."
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return paragraphs
+
+
+def throughput(fn, payload, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(payload)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mb", type=float, default=5.0, help="synthetic document size in MB")
+    parser.add_argument("--noise", type=float, default=0.05, help="share of tokens that are boilerplate/noise")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paragraphs = make_document(args.mb, args.noise)
+    document = "\n\n".join(paragraphs)
+    mb = len(document.encode("utf-8")) / 2**20
+
+    assert legacy_clean_text(document) == clean_text_normalizer.normalize(document), "outputs differ (document)"
+    assert [legacy_clean_text(p) for p in paragraphs] == list(clean_text_normalizer.normalize_stream(paragraphs)), \
+        "outputs differ (paragraphs)"
+
+    cases = [
+        ("legacy clean_text, whole document", legacy_clean_text, document),
+        ("TextNormalizer, whole document", clean_text_normalizer.normalize, document),
+        ("legacy clean_text, per paragraph", lambda ps: [legacy_clean_text(p) for p in ps], paragraphs),
+        ("TextNormalizer, streamed paragraphs", lambda ps: list(clean_text_normalizer.normalize_stream(ps)), paragraphs),
+    ]
+    print(f"Document: {mb:.1f} MB, {len(paragraphs)} paragraphs (best of {args.repeat})")
+    for name, fn, payload in cases:
+        seconds = throughput(fn, payload, args.repeat)
+        print(f"  {name:<40} {seconds:7.3f}s  {mb / seconds:7.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: approximate (IVF) vs exact reference-term search.
+
+    python -m benchmarks.bench_vector_index [--rows 100000 1000000] [--n-probe 4 8 16]
+
+Generates clustered unit vectors shaped like sentence embeddings, builds
+each index, and reports build time, query throughput and recall@1 of the
+IVF index against exact search.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from utils.vector_index import ExactVectorIndex, IVFVectorIndex, measure_recall
+
+
+def make_vectors(rows, dim, clusters, seed=0):
+    """Unit vectors scattered around `clusters` random topic directions."""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = topics[rng.integers(0, clusters, rows)]
+    vectors += 0.6 * rng.standard_normal((rows, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def queries_near(vectors, n, noise=0.3, seed=1):
+    """Perturbed copies of stored rows, like candidates close to known terms."""
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), n)].copy()
+    queries += noise * rng.standard_normal(queries.shape).astype(np.float32) / np.sqrt(vectors.shape[1])
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return queries
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 500000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[4, 8, 16])
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'backend':>12} {'build s':>8} {'queries/s':>10} {'recall@1':>9}")
+    for rows in args.rows:
+        vectors = make_vectors(rows, args.dim, clusters=max(50, rows // 2000))
+        queries = queries_near(vectors, args.queries)
+
+        exact = ExactVectorIndex(vectors)
+        exact_s, _ = timed(exact.search, queries)
+        print(f"{rows:>9} {'exact':>12} {0.0:>8.2f} {len(queries) / exact_s:>10.0f} {1.0:>9.3f}")
+
+        build_s, ivf = timed(IVFVectorIndex, vectors)
+        for n_probe in args.n_probe:
+            ivf.n_probe = n_probe
+            search_s, _ = timed(ivf.search, queries)
+            recall = measure_recall(ivf, queries, exact_index=exact)
+            label = f"ivf/{n_probe}"
+            print(f"{rows:>9} {label:>12} {build_s:>8.2f} {len(queries) / search_s:>10.0f} {recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Batched enrichment prompts shared by the Gemini and OpenAI enrichers.
+
+Several terms with their contexts are packed into one prompt that asks for
+a JSON array with one object per term. The response is validated and split
+back per term; terms missing from it are left to the caller to retry alone.
+"""
+import json
+import re
+
+from enrichment.rate_limiter import estimate_tokens
+
+# Expected answer size per term, counted against the batch token budget
+OUTPUT_TOKENS_PER_TERM = 150
+
+ENRICHMENT_FIELDS = ("term_definition", "business_domain", "synonyms", "term_context")
+
+
+def term_contexts(term_obj, limit=3):
+    contexts = [c.get("original_sentence") for c in term_obj.get("contexts", []) if c.get("original_sentence")]
+    return contexts[:limit]
+
+
+def _term_block(number, term_obj):
+    domain_hint = term_obj.get("domain_name") or "Unknown"
+    context_str = "\n".join(f"  - {c}" for c in term_contexts(term_obj))
+    return f"""{number}. TERM: "{term_obj['term']}"
+   DOMAIN HINT: {domain_hint}
+   CONTEXT EXAMPLES:
+{context_str}
+"""
+
+
+def term_prompt_text(term_obj):
+    """The per-term part of an enrichment prompt (term, domain hint, contexts); its cache identity."""
+    return _term_block(1, term_obj)
+
+
+def build_batch_prompt(term_objs, wrap_in_object=False):
+    """
+    Prompt enriching all `term_objs` at once. With wrap_in_object the array
+    is requested under a "terms" key (for JSON-object response modes).
+    """
+    blocks = "\n".join(_term_block(i, t) for i, t in enumerate(term_objs, 1))
+    shape = 'a JSON object {"terms": [...]}' if wrap_in_object else "a JSON array"
+    return f"""
+You are a business and data governance expert.
+Enrich each of the following business glossary entries based on its context.
+
+{blocks}
+Return **valid JSON only**: {shape} with exactly one object per term, each with these keys:
+- term (copied exactly as given)
+- term_definition: one or two sentences defining the business meaning of the term
+- business_domain: the most relevant domain (keep the hint if it fits)
+- synonyms: list of 2-4 short synonymous or related terms
+- term_context: one or two sentences describing how the term is used
+"""
+
+
+def plan_batches(term_objs, token_budget, max_terms):
+    """
+    Group terms so each batch's prompt plus expected answer stays within
+    `token_budget` tokens and `max_terms` terms. A term larger than the
+    budget gets a batch of its own.
+    """
+    overhead = estimate_tokens(build_batch_prompt([]))
+    batches, current, used = [], [], overhead
+    for term_obj in term_objs:
+        cost = estimate_tokens(_term_block(len(current) + 1, term_obj)) + OUTPUT_TOKENS_PER_TERM
+        if current and (used + cost > token_budget or len(current) >= max_terms):
+            batches.append(current)
+            current, used = [], overhead
+        current.append(term_obj)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _term_key(term):
+    return re.sub(r"\s+", " ", str(term or "").strip().lower())
+
+
+def parse_batch_response(text, term_objs):
+    """
+    Split a batch answer back per term.
+
+    Accepts a JSON array, or an object holding the array (e.g. {"terms": [...]}).
+    Entries that are not objects, name a term that was not asked for, or
+    have none of the enrichment fields are dropped.
+
+    Returns:
+        {term: parsed dict} for the terms found in the answer.
+    """
+    text = (text or "").strip()
+    start = min((i for i in (text.find("["), text.find("{")) if i >= 0), default=-1)
+    if start < 0:
+        raise ValueError("No JSON found in batch response")
+    data = json.loads(text[start:max(text.rfind("]"), text.rfind("}")) + 1])
+
+    if isinstance(data, dict):
+        data = next((v for v in data.values() if isinstance(v, list)), [data])
+    if not isinstance(data, list):
+        raise ValueError("Batch response is not a JSON array")
+
+    wanted = {_term_key(t["term"]): t["term"] for t in term_objs}
+    parsed = {}
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        term = wanted.get(_term_key(item.get("term")))
+        if term is None or term in parsed:
+            continue
+        if not any(item.get(field) for field in ENRICHMENT_FIELDS):
+            continue
+        parsed[term] = item
+    return parsed
+
+
+def enriched_record(term_obj, parsed, default_domain=None):
+    """The enriched glossary record for one term from its parsed answer."""
+    synonyms = parsed.get("synonyms", [])
+    return {
+        **term_obj,
+        "term_definition": parsed.get("term_definition"),
+        "business_domain": parsed.get("business_domain", default_domain),
+        "synonyms": synonyms if isinstance(synonyms, list) else [synonyms],
+        "term_context": parsed.get("term_context"),
+    }
@@ -1,48 +1,75 @@
-from sentence_transformers import SentenceTransformer, util
+import threading
 import numpy as np
-import json
+from models.db import SessionLocal
 from services.business_domain_repository import BusinessDomainRepository
+from utils.embedding_cache import encode_texts
 
-repo = BusinessDomainRepository()
+# Domain embedding matrix, rebuilt only when the business_domain table changes
+_domain_cache = {"fingerprint": None, "domains": [], "embeddings": None}
+_domain_cache_lock = threading.Lock()
 
-from utils.constants import SENTENCE_MODEL
 
-model = SentenceTransformer(SENTENCE_MODEL)
+def _normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def get_domain_embeddings():
+    """
+    Return (domains, embeddings) where domains is a list of (id, business_value)
+    and embeddings the matching unit-normalized matrix. Cached until the
+    business_domain table fingerprint changes; the fingerprint is checked on
+    every call. Reads go through a short-lived session of their own, so a
+    reload sees the current table and never touches the caller's session.
+    """
+    with SessionLocal() as session:
+        repo = BusinessDomainRepository(session)
+        fingerprint = repo.get_fingerprint()
+        with _domain_cache_lock:
+            if _domain_cache["fingerprint"] != fingerprint:
+                domains = [(d.id, d.business_value) for d in repo.get_all()]
+                embeddings = None
+                if domains:
+                    embeddings = _normalize_rows(encode_texts([value for _, value in domains]))
+                _domain_cache.update(fingerprint=fingerprint, domains=domains, embeddings=embeddings)
+            return _domain_cache["domains"], _domain_cache["embeddings"]
 
 
 def classify_domain(candidate_terms, threshold=0.6):
     """
     Classify each candidate term into the most likely business domain.
+    Domain edits are picked up on the next call (see get_domain_embeddings).
     """
-    # Load domains
-    domains = repo.get_all()
+    # Load domains (re-checked against the table on every call)
+    domains, domain_embeddings = get_domain_embeddings()
     if not domains:
         print("No business domains found in database.")
         return []
 
-    # Prepare embeddings
-    domain_texts = [d.business_value for d in domains]
-    domain_embeddings = model.encode(domain_texts, convert_to_tensor=True)
-
-    results = []
+    if not candidate_terms:
+        return []
 
-    for term in candidate_terms:
-        term_text = term.get("term") if isinstance(term, dict) else term
-        term_emb = model.encode(term_text, convert_to_tensor=True)
-        similarities = util.cos_sim(term_emb, domain_embeddings)[0]
+    # Encode all terms in one batch and score them against every domain at once
+    term_texts = [term.get("term") if isinstance(term, dict) else term for term in candidate_terms]
+    term_embeddings = _normalize_rows(encode_texts(term_texts))
+    similarities = term_embeddings @ domain_embeddings.T
+    best_indices = similarities.argmax(axis=1)
+    best_scores = similarities[np.arange(len(term_texts)), best_indices]
 
-        # Find best domain
-        best_idx = int(np.argmax(similarities))
-        best_score = float(similarities[best_idx])
+    results = []
+    for term, term_text, best_idx, best_score in zip(candidate_terms, term_texts, best_indices, best_scores):
+        best_score = float(best_score)
+        contexts = term.get("contexts") if isinstance(term, dict) else None
 
         if best_score >= threshold:
-            matched_domain = domains[best_idx]
+            domain_id, domain_name = domains[int(best_idx)]
             results.append({
                 "term": term_text,
-                "domain_id": matched_domain.id,
-                "domain_name": matched_domain.business_value,
+                "domain_id": domain_id,
+                "domain_name": domain_name,
                 "domain_score": best_score,
-                "contexts": term.get("contexts")
+                "contexts": contexts
             })
         else:
             results.append({
@@ -50,7 +77,7 @@ def classify_domain(candidate_terms, threshold=0.6):
                 "domain_id": None,
                 "domain_name": None,
                 "domain_score": best_score,
-                "contexts": term.get("contexts")
+                "contexts": contexts
             })
 
     return results
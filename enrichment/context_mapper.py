@@ -1,5 +1,5 @@
 from enrichment.classifier import classify_domain
-from enrichment.gemini_enricher import enrich_business_terms_gemini_async
+from enrichment.router import build_router
 import json, asyncio
 
 def enrich_terms(terms):
@@ -16,7 +16,13 @@ def enrich_terms(terms):
     return ai_enriched
 
 async def enrich_business_terms(classified_terms):
-    return await enrich_business_terms_gemini_async(classified_terms, concurrency=5)
+    # Configured provider, hedged to / falling back on ENRICHMENT_FALLBACK_PROVIDER
+    router = build_router()
+    try:
+        return await router.enrich_terms(classified_terms)
+    finally:
+        # The clients are bound to this run's event loop
+        await router.aclose()
 
 def summerize_enriched_terms(enriched_terms):
     
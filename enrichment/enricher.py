@@ -0,0 +1,38 @@
+"""
+Common interface of the enrichment providers.
+
+An Enricher sends one enrichment request for a batch of terms (a single
+term is a batch of one) and returns one record per term, in order. A term
+it could not enrich comes back with term_definition None. Each provider
+keeps its own rate limiter, adaptive concurrency and counters for the run.
+"""
+from abc import ABC, abstractmethod
+
+from enrichment.rate_limiter import TokenBucketLimiter, AdaptiveConcurrency, EnrichmentStats
+from utils.constants import ENRICHMENT_INITIAL_CONCURRENCY, ENRICHMENT_MAX_CONCURRENCY
+
+
+def is_enriched(record) -> bool:
+    return bool(record.get("term_definition")) and not record.get("error")
+
+
+class Enricher(ABC):
+    """Base class: provider name, model name and per-run request control."""
+
+    name = None
+
+    def __init__(self, model, requests_per_minute, tokens_per_minute=None, concurrency=ENRICHMENT_MAX_CONCURRENCY):
+        self.model = model
+        self.limiter = TokenBucketLimiter(requests_per_minute, tokens_per_minute)
+        self.concurrency = AdaptiveConcurrency(min(ENRICHMENT_INITIAL_CONCURRENCY, concurrency), concurrency)
+        self.stats = EnrichmentStats()
+
+    @abstractmethod
+    async def enrich(self, batch):
+        """Enrich `batch` (list of term dicts with contexts); one record per term."""
+
+    async def aclose(self):
+        """Release the provider's clients for the running event loop."""
+
+    def report(self):
+        return self.stats.report(self.concurrency)
@@ -1,25 +1,88 @@
 import os
 import json
 import asyncio
-import random
-import google.generativeai as genai
-from functools import partial
-
-# Configure Gemini
-genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
 
+from enrichment.rate_limiter import estimate_tokens, call_with_retries
+from enrichment.batching import (
+    OUTPUT_TOKENS_PER_TERM,
+    build_batch_prompt,
+    parse_batch_response,
+    enriched_record,
+    term_contexts,
+)
+from enrichment.enricher import Enricher
+from utils.constants import (
+    GEMINI_REQUESTS_PER_MINUTE,
+    GEMINI_TOKENS_PER_MINUTE,
+    ENRICHMENT_MAX_CONCURRENCY,
+    LLM_REQUEST_TIMEOUT_SECONDS,
+)
+
+PROVIDER = "gemini"
 MODEL_NAME = "gemini-2.5-flash"
 
+_async_clients = {}
+
+
+def get_async_client():
+    """
+    google-genai client for the running event loop, created on first use
+    (needs GOOGLE_API_KEY). Its async HTTP connections are bound to the loop
+    that opened them, so each loop gets its own client.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        from google import genai
+        from google.genai import types
+
+        client = genai.Client(
+            api_key=os.environ["GOOGLE_API_KEY"],
+            http_options=types.HttpOptions(timeout=int(LLM_REQUEST_TIMEOUT_SECONDS * 1000)),
+        )
+        # Clients of finished loops cannot be reused; drop them
+        for old_loop in [l for l in _async_clients if l.is_closed()]:
+            del _async_clients[old_loop]
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_client():
+    """Close the running loop's client (at the end of an enrichment run)."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aio.aclose()
+        client.close()
+
+# --- Rate-limited request with retries ---
+async def generate_with_retries(model, prompt, tokens, parse, limiter, concurrency, stats, label, max_retries=5):
+    """
+    Send one prompt to `model` with the async client and return parse(response text).
+    Rate limiting and retries are handled by call_with_retries.
+    """
+    async def generate():
+        response = await get_async_client().aio.models.generate_content(model=model, contents=prompt)
+        return response.text
+
+    return await call_with_retries(generate, tokens, parse, limiter, concurrency, stats, label,
+                                   max_retries=max_retries)
+
+
+def _parse_json_object(text):
+    json_start = text.find("{")
+    json_end = text.rfind("}") + 1
+    return json.loads(text[json_start:json_end])
+
 # --- Single term enrichment ---
-async def enrich_single_term(model, term_obj, max_retries=3):
+async def enrich_single_term(model, term_obj, limiter, concurrency, stats, max_retries=5):
     """
-    Asynchronously enrich a single term with retry and delay.
+    Asynchronously enrich a single term.
     """
-    contexts = [c.get("original_sentence") for c in term_obj.get("contexts", []) if c.get("original_sentence")]
+    contexts = term_contexts(term_obj)
     if not contexts:
         return {**term_obj, "term_definition": None, "error": "no context"}
 
-    context_str = "\n".join(contexts[:3])
+    context_str = "\n".join(contexts)
     domain_hint = term_obj.get("domain_name") or "Unknown"
 
     prompt = f"""
@@ -38,51 +101,56 @@ Return **valid JSON only** with these keys:
 - synonyms
 - term_context
 """
-
-    delay_base = 15  # base delay between retries
-    for attempt in range(1, max_retries + 1):
-        try:
-            # Run Gemini call in executor
-            loop = asyncio.get_running_loop()
-            response = await loop.run_in_executor(None, lambda: model.generate_content(prompt))
-            text = response.text.strip()
-
-            json_start = text.find("{")
-            json_end = text.rfind("}") + 1
-            parsed = json.loads(text[json_start:json_end])
-
-            return {
-                **term_obj,
-                "term_definition": parsed.get("term_definition"),
-                "business_domain": parsed.get("business_domain", domain_hint),
-                "synonyms": parsed.get("synonyms", []),
-                "term_context": parsed.get("term_context"),
-            }
-
-        except Exception as e:
-            print(f"[Attempt {attempt}] Error: {e}")
-            if attempt == max_retries:
-                return {**term_obj, "term_definition": None, "error": str(e)}
-            
-            # Add exponential backoff + jitter
-            delay = delay_base * (2 ** (attempt - 1)) + random.uniform(0, 1)
-            await asyncio.sleep(delay)
-
-# --- Batch enrichment orchestrator ---
-async def enrich_business_terms_gemini_async(term_candidates, concurrency=5, delay_in_seconds=20.0):
+    tokens = estimate_tokens(prompt) + OUTPUT_TOKENS_PER_TERM
+    try:
+        parsed = await generate_with_retries(model, prompt, tokens, _parse_json_object, limiter, concurrency,
+                                             stats, f"'{term_obj['term']}'", max_retries=max_retries)
+    except Exception as e:
+        stats.failed += 1
+        return {**term_obj, "term_definition": None, "error": str(e)}
+
+    return enriched_record(term_obj, parsed, domain_hint)
+
+# --- Batched enrichment ---
+async def enrich_term_batch(model, batch, limiter, concurrency, stats, max_retries=2):
     """
-    Enrich multiple terms concurrently with rate limiting and random delay between tasks.
+    Enrich several terms with one request. Terms missing from (or invalid
+    in) the answer are retried one by one with enrich_single_term.
     """
-    model = genai.GenerativeModel(MODEL_NAME)
-    semaphore = asyncio.Semaphore(concurrency)
-
-    async def limited_enrich(term):
-        async with semaphore:
-            # Add a delay to stagger requests
-            await asyncio.sleep(delay_in_seconds)
-            return await enrich_single_term(model, term)
-
-    tasks = [asyncio.create_task(limited_enrich(t)) for t in term_candidates[:10]]
-    results = await asyncio.gather(*tasks)
-    return results
-
+    prompt = build_batch_prompt(batch)
+    tokens = estimate_tokens(prompt) + OUTPUT_TOKENS_PER_TERM * len(batch)
+    try:
+        parsed = await generate_with_retries(model, prompt, tokens, lambda text: parse_batch_response(text, batch),
+                                             limiter, concurrency, stats, f"batch of {len(batch)}",
+                                             max_retries=max_retries)
+    except Exception:
+        parsed = {}
+
+    missing = [t for t in batch if t["term"] not in parsed]
+    if missing:
+        print(f"Batch answer missed {len(missing)} of {len(batch)} terms, retrying them singly")
+    retried = await asyncio.gather(*(enrich_single_term(model, t, limiter, concurrency, stats) for t in missing))
+    retried = dict(zip((id(t) for t in missing), retried))
+
+    return [
+        enriched_record(t, parsed[t["term"]], t.get("domain_name") or "Unknown")
+        if t["term"] in parsed else retried[id(t)]
+        for t in batch
+    ]
+
+class GeminiEnricher(Enricher):
+    """Gemini behind the common enricher interface."""
+
+    name = PROVIDER
+
+    def __init__(self, model=MODEL_NAME, requests_per_minute=GEMINI_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=GEMINI_TOKENS_PER_MINUTE, concurrency=ENRICHMENT_MAX_CONCURRENCY):
+        super().__init__(model, requests_per_minute, tokens_per_minute, concurrency)
+
+    async def enrich(self, batch):
+        if len(batch) == 1:
+            return [await enrich_single_term(self.model, batch[0], self.limiter, self.concurrency, self.stats)]
+        return await enrich_term_batch(self.model, batch, self.limiter, self.concurrency, self.stats)
+
+    async def aclose(self):
+        await close_async_client()
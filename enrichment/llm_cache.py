@@ -0,0 +1,117 @@
+"""
+Persistent cache of LLM enrichment results.
+
+Entries are content-addressed by (provider, model, normalized per-term
+prompt), so a term is only sent again when its name, domain hint or
+contexts change. Entries expire after a TTL, and the least recently used
+ones are evicted once the cache exceeds its size limit.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+from enrichment.batching import ENRICHMENT_FIELDS, term_prompt_text
+from utils.constants import LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Whitespace-insensitive form of a prompt for cache keys."""
+    return re.sub(r"\s+", " ", (prompt or "").strip())
+
+
+class LLMCache:
+    """SQLite cache of parsed enrichment answers with TTL and LRU size eviction."""
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_results ("
+                "key TEXT PRIMARY KEY, provider TEXT NOT NULL, model TEXT NOT NULL, "
+                "value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_results_accessed ON llm_results (accessed)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def make_key(provider, model, prompt):
+        return hashlib.sha256(f"{provider}\x1f{model}\x1f{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        """Return {key: cached dict} for the keys with a live entry."""
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        now = time.time()
+        with self._connect() as conn:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(unique), 500):
+                batch = unique[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, value FROM llm_results WHERE key IN ({placeholders}) AND created >= ?",
+                    batch + [now - self.ttl_seconds],
+                )
+                found.update((key, json.loads(value)) for key, value in rows.fetchall())
+            if found:
+                conn.executemany("UPDATE llm_results SET accessed = ? WHERE key = ?",
+                                 ((now, key) for key in found))
+        self.hits += sum(1 for k in keys if k in found)
+        self.misses += sum(1 for k in keys if k not in found)
+        return found
+
+    def put_many(self, items):
+        """Store (key, provider, model, value dict) items, then enforce TTL and size."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO llm_results (key, provider, model, value, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((key, provider, model, json.dumps(value, ensure_ascii=False), now, now)
+                 for key, provider, model, value in items),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM llm_results WHERE created < ?", (now - self.ttl_seconds,))
+        excess = conn.execute("SELECT COUNT(*) FROM llm_results").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM llm_results WHERE key IN "
+                "(SELECT key FROM llm_results ORDER BY accessed LIMIT ?)", (excess,)
+            )
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+def term_cache_keys(provider, model, term_objs):
+    """Cache key of every term, from its normalized per-term prompt."""
+    return [LLMCache.make_key(provider, model, term_prompt_text(t)) for t in term_objs]
+
+
+def store_results(cache, provider, model, keys, records):
+    """Cache the enrichment fields of every successfully enriched record."""
+    items = [
+        (key, provider, model, {field: record.get(field) for field in ENRICHMENT_FIELDS})
+        for key, record in zip(keys, records)
+        if record.get("term_definition") and not record.get("error")
+    ]
+    if items:
+        cache.put_many(items)
@@ -1,31 +1,80 @@
-from openai import OpenAI
-import json, time
+import asyncio
+import json
 
-client = OpenAI()
+from enrichment.batching import (
+    OUTPUT_TOKENS_PER_TERM,
+    build_batch_prompt,
+    parse_batch_response,
+    enriched_record,
+    term_contexts,
+)
+from enrichment.enricher import Enricher
+from enrichment.rate_limiter import estimate_tokens, call_with_retries
+from utils.constants import (
+    ENRICHMENT_MAX_CONCURRENCY,
+    OPENAI_REQUESTS_PER_MINUTE,
+    OPENAI_TOKENS_PER_MINUTE,
+    LLM_REQUEST_TIMEOUT_SECONDS,
+    LLM_CONNECT_TIMEOUT_SECONDS,
+    LLM_MAX_CONNECTIONS,
+)
 
-def enrich_business_terms(term_candidates, model="gpt-4o-mini", delay=1.5):
+PROVIDER = "openai"
+MODEL_NAME = "gpt-4o-mini"
+
+_clients = {}
+
+def get_async_client():
     """
-    Enrich extracted business terms with:
-    - term_definition
-    - business_domain (refined or inferred)
-    - synonyms
-    - term_context (short summary)
-
-    Each item in term_candidates should include:
-      term, domain_name, contexts (list of {original_sentence, lemmatized_sentence, context_score})
+    AsyncOpenAI client for the running event loop (reads OPENAI_API_KEY),
+    created on first use. All requests on the loop share its keep-alive
+    httpx connection pool.
     """
-    enriched_terms = []
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        import httpx
+        from openai import AsyncOpenAI
+
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS,
+                                max_keepalive_connections=LLM_MAX_CONNECTIONS),
+            timeout=httpx.Timeout(LLM_REQUEST_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+        )
+        client = AsyncOpenAI(http_client=http_client, max_retries=0)  # retries are ours
+        # Clients of finished loops cannot be reused; drop them
+        for old_loop in [l for l in _clients if l.is_closed()]:
+            del _clients[old_loop]
+        _clients[loop] = client
+    return client
 
-    for t in term_candidates:
-        # Skip if no valid context
-        contexts = [c.get("original_sentence", "") for c in t.get("contexts", []) if c.get("original_sentence")]
-        if not contexts:
-            continue
+async def close_async_client():
+    """Close the running loop's client and its connection pool (at the end of an enrichment run)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
 
-        context_str = "\n".join(contexts[:3])  # limit to top 3 for brevity
-        domain_hint = t.get("domain_name") or "Unknown"
+async def complete_json(prompt, model, tokens, limiter, concurrency, stats, label, parse=json.loads, max_retries=5):
+    """Send one JSON-mode chat completion and return parse(answer)."""
+    async def complete():
+        response = await get_async_client().chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.4,
+            response_format={"type": "json_object"},
+            timeout=LLM_REQUEST_TIMEOUT_SECONDS,
+        )
+        return response.choices[0].message.content
 
-        prompt = f"""
+    return await call_with_retries(complete, tokens, parse, limiter, concurrency, stats, label,
+                                   max_retries=max_retries)
+
+async def enrich_single_term(t, limiter, concurrency, stats, model=MODEL_NAME):
+    """Enrich one term with its own request."""
+    context_str = "\n".join(term_contexts(t))  # limit to top 3 for brevity
+    domain_hint = t.get("domain_name") or "Unknown"
+
+    prompt = f"""
 You are a data governance and financial domain expert.
 Based on the provided term, its usage context, and domain hint,
 enrich the business glossary entry.
@@ -42,30 +91,54 @@ Return JSON with the following fields:
 - synonyms: list of 2–4 short synonymous or related terms.
 - term_context: concise summary (one or two sentences) describing how the term is used.
 """
+    tokens = estimate_tokens(prompt) + OUTPUT_TOKENS_PER_TERM
+
+    try:
+        enrich_data = await complete_json(prompt, model, tokens, limiter, concurrency, stats, f"'{t['term']}'")
+        return enriched_record(t, enrich_data, t.get("domain_name"))
+
+    except Exception as e:
+        print(f"⚠️ Error enriching term '{t['term']}': {e}")
+        stats.failed += 1
+        return {**t, "term_definition": None}
+
+async def enrich_term_batch(batch, limiter, concurrency, stats, model=MODEL_NAME):
+    """
+    Enrich several terms with one request; terms missing from the answer
+    are retried on their own.
+    """
+    prompt = build_batch_prompt(batch, wrap_in_object=True)
+    tokens = estimate_tokens(prompt) + OUTPUT_TOKENS_PER_TERM * len(batch)
+    try:
+        parsed = await complete_json(prompt, model, tokens, limiter, concurrency, stats,
+                                     f"batch of {len(batch)}", parse=lambda text: parse_batch_response(text, batch),
+                                     max_retries=2)
+    except Exception as e:
+        print(f"⚠️ Error enriching batch of {len(batch)} terms: {e}")
+        parsed = {}
+
+    missing = [t for t in batch if t["term"] not in parsed]
+    retried = await asyncio.gather(*(enrich_single_term(t, limiter, concurrency, stats, model) for t in missing))
+    retried = dict(zip((id(t) for t in missing), retried))
 
-        try:
-            response = client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.4,
-                response_format={"type": "json_object"},
-            )
+    return [
+        enriched_record(t, parsed[t["term"]], t.get("domain_name")) if t["term"] in parsed else retried[id(t)]
+        for t in batch
+    ]
 
-            data = response.choices[0].message.content
-            enrich_data = json.loads(data) if isinstance(data, str) else data
+class OpenAIEnricher(Enricher):
+    """OpenAI behind the common enricher interface."""
 
-            enriched_terms.append({
-                **t,
-                "term_definition": enrich_data.get("term_definition"),
-                "business_domain": enrich_data.get("business_domain", t.get("domain_name")),
-                "synonyms": enrich_data.get("synonyms", []),
-                "term_context": enrich_data.get("term_context"),
-            })
+    name = PROVIDER
 
-        except Exception as e:
-            print(f"⚠️ Error enriching term '{t['term']}': {e}")
-            enriched_terms.append({**t, "term_definition": None})
+    def __init__(self, model=MODEL_NAME, requests_per_minute=OPENAI_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=OPENAI_TOKENS_PER_MINUTE, concurrency=ENRICHMENT_MAX_CONCURRENCY):
+        super().__init__(model, requests_per_minute, tokens_per_minute, concurrency)
 
-        time.sleep(delay)  # avoid rate limit
+    async def enrich(self, batch):
+        if len(batch) == 1:
+            return [await enrich_single_term(batch[0], self.limiter, self.concurrency, self.stats, self.model)]
+        return await enrich_term_batch(batch, self.limiter, self.concurrency, self.stats, self.model)
 
-    return enriched_terms
+    async def aclose(self):
+        await close_async_client()
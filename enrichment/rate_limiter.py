@@ -0,0 +1,215 @@
+"""
+Client-side rate limiting for LLM enrichment.
+
+TokenBucketLimiter keeps requests within a provider's requests-per-minute
+and tokens-per-minute quotas. AdaptiveConcurrency caps requests in flight
+and adjusts the cap AIMD-style: halve it on a rate-limit (429) response,
+then raise it by one after a run of successes. EnrichmentStats collects
+per-run throughput, and call_with_retries runs one request under all three.
+A RequestClock records when a request was actually sent, after queueing for
+a slot and for quota.
+"""
+import asyncio
+import contextvars
+import random
+import time
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for quota accounting (about 4 characters per token)."""
+    return max(1, len(text or "") // 4)
+
+
+def is_rate_limit_error(error) -> bool:
+    """True for provider "too many requests" / quota errors (HTTP 429)."""
+    if type(error).__name__ in ("ResourceExhausted", "RateLimitError", "TooManyRequests"):
+        return True
+    for attr in ("status_code", "code", "status"):
+        if getattr(error, attr, None) == 429:
+            return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "quota" in message
+
+
+def retry_after_seconds(error, default=None):
+    """Server-suggested wait from a Retry-After header, if the error carries one."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return default
+
+
+class TokenBucketLimiter:
+    """Two token buckets (requests and LLM tokens) refilled continuously per minute."""
+
+    def __init__(self, requests_per_minute, tokens_per_minute=None):
+        self.rpm = requests_per_minute
+        self.tpm = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute) if tokens_per_minute else None
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self._tokens is not None:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens=1):
+        """Wait until one request of `tokens` tokens fits in both quotas, then take it."""
+        if self.tpm:
+            tokens = min(tokens, self.tpm)  # an oversized request waits for a full bucket
+        # The lock makes waiters queue in arrival order
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = 0.0
+                if self._requests < 1:
+                    wait = (1 - self._requests) * 60 / self.rpm
+                if self._tokens is not None and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+                if wait <= 0:
+                    self._requests -= 1
+                    if self._tokens is not None:
+                        self._tokens -= tokens
+                    return
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds):
+        """Empty the request bucket so no request starts for about `seconds` (after a 429)."""
+        self._refill()
+        self._requests = min(self._requests, 1 - seconds * self.rpm / 60)
+
+
+class AdaptiveConcurrency:
+    """Concurrency cap with additive increase / multiplicative decrease."""
+
+    def __init__(self, initial, maximum, minimum=1, increase_after=5):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = max(minimum, min(initial, maximum))
+        self.increase_after = increase_after
+        self.in_flight = 0
+        self.peak = self.limit
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        self._successes += 1
+        if self._successes >= self.increase_after and self.limit < self.maximum:
+            self.limit += 1
+            self.peak = max(self.peak, self.limit)
+            self._successes = 0
+
+    def on_rate_limited(self):
+        self.limit = max(self.minimum, self.limit // 2)
+        self._successes = 0
+
+
+class EnrichmentStats:
+    """Counters for one enrichment run."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.terms = 0
+        self.failed = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.tokens = 0
+
+    def report(self, concurrency=None):
+        elapsed = time.perf_counter() - self.started
+        per_minute = 60 / elapsed if elapsed > 0 else 0.0
+        report = {
+            "terms": self.terms,
+            "failed": self.failed,
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "estimated_tokens": self.tokens,
+            "seconds": round(elapsed, 2),
+            "terms_per_minute": round(self.terms * per_minute, 1),
+            "requests_per_minute": round(self.requests * per_minute, 1),
+        }
+        if concurrency is not None:
+            report["final_concurrency"] = concurrency.limit
+            report["peak_concurrency"] = concurrency.peak
+        return report
+
+
+class RequestClock:
+    """When the first request of a call went out, after any queueing."""
+
+    def __init__(self):
+        self.sent_at = None
+        self.sent = asyncio.Event()
+
+    def mark_sent(self):
+        if self.sent_at is None:
+            self.sent_at = time.perf_counter()
+            self.sent.set()
+
+
+_request_clock = contextvars.ContextVar("request_clock", default=None)
+
+
+def use_request_clock(clock: RequestClock):
+    """Have requests sent from the current context (and tasks it starts) report to `clock`."""
+    _request_clock.set(clock)
+
+
+def mark_request_sent():
+    clock = _request_clock.get()
+    if clock is not None:
+        clock.mark_sent()
+
+
+async def call_with_retries(call, tokens, parse, limiter, concurrency, stats, label, max_retries=5):
+    """
+    Run one LLM request, `call()` (a coroutine function returning the answer
+    text), and return parse(text).
+
+    Every attempt waits for a concurrency slot, then for the rate limiter. A 429
+    halves the concurrency and pauses the limiter (for Retry-After if given)
+    before retrying; other errors, including unparsable answers and
+    timeouts, are retried with a short backoff. The last error is raised.
+    """
+    for attempt in range(1, max_retries + 1):
+        try:
+            async with concurrency:
+                await limiter.acquire(tokens)
+                mark_request_sent()
+                stats.requests += 1
+                stats.tokens += tokens
+                text = await call()
+            result = parse((text or "").strip())
+            concurrency.on_success()
+            return result
+
+        except Exception as e:
+            print(f"[Attempt {attempt}] Error for {label}: {e!r}")
+            if attempt == max_retries:
+                raise
+
+            if is_rate_limit_error(e):
+                stats.rate_limited += 1
+                concurrency.on_rate_limited()
+                limiter.pause(retry_after_seconds(e, default=2 ** attempt))
+            else:
+                # Add exponential backoff + jitter
+                await asyncio.sleep(2 ** (attempt - 1) + random.uniform(0, 1))
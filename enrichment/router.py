@@ -0,0 +1,234 @@
+"""
+Routing of enrichment requests across providers.
+
+EnrichmentRouter sends every batch to the primary enricher. Once enough
+primary latencies have been observed, a batch still unanswered after the
+configured latency percentile (counted from when its request was sent) is
+hedged: the same batch goes to the
+secondary enricher and the first complete answer wins (the other request is
+cancelled). Terms the answering provider failed to enrich are retried on
+the other provider. Cached answers from either provider are reused.
+"""
+import asyncio
+import time
+from collections import deque
+
+from enrichment.batching import plan_batches, enriched_record, term_contexts
+from enrichment.enricher import is_enriched
+from enrichment.rate_limiter import RequestClock, use_request_clock
+from enrichment.llm_cache import LLMCache, term_cache_keys, store_results
+from utils.constants import (
+    ENRICHMENT_PROVIDER,
+    ENRICHMENT_FALLBACK_PROVIDER,
+    ENRICHMENT_HEDGE_PERCENTILE,
+    ENRICHMENT_HEDGE_MIN_SAMPLES,
+    ENRICHMENT_BATCH_TOKEN_BUDGET,
+    ENRICHMENT_BATCH_MAX_TERMS,
+)
+
+
+def get_enricher(name, **kwargs):
+    """Create the enricher for a provider name ("gemini", "openai" or "stub")."""
+    if name == "gemini":
+        from enrichment.gemini_enricher import GeminiEnricher
+        return GeminiEnricher(**kwargs)
+    if name == "openai":
+        from enrichment.openai_enricher import OpenAIEnricher
+        return OpenAIEnricher(**kwargs)
+    if name == "stub":
+        from enrichment.stub_enricher import StubEnricher
+        return StubEnricher(**kwargs)
+    raise ValueError(f"Unknown enrichment provider: {name}")
+
+
+class EnrichmentRouter:
+    def __init__(self, primary, secondary=None, hedge_percentile=ENRICHMENT_HEDGE_PERCENTILE,
+                 hedge_min_samples=ENRICHMENT_HEDGE_MIN_SAMPLES, latency_window=200, max_in_flight=None):
+        """
+        Args:
+            primary, secondary: Enricher instances; without a secondary there
+                is no hedging or fallback.
+            hedge_percentile: primary latency percentile (0-100) after which
+                a batch is hedged; 0 disables hedging (fallback still applies).
+            max_in_flight: batches routed at once (default: the primary's
+                maximum concurrency).
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.max_in_flight = max_in_flight or primary.concurrency.maximum
+        self.latencies = deque(maxlen=latency_window)
+        self.hedged = 0
+        self.hedges_won = 0
+        self.fallbacks = 0
+
+    def hedge_delay(self):
+        """Seconds to wait for the primary before hedging, or None when not hedging."""
+        if self.secondary is None or not self.hedge_percentile or len(self.latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        rank = min(len(ordered) - 1, int(round(self.hedge_percentile / 100 * (len(ordered) - 1))))
+        return ordered[rank]
+
+    async def _call(self, enricher, batch, clock=None):
+        """
+        Run one request; an exception counts as every term failing.
+        Primary latencies are measured from when the request was sent, so
+        time queued in the enricher's concurrency cap and rate limiter does
+        not count.
+        """
+        clock = clock or RequestClock()
+        use_request_clock(clock)
+        try:
+            records = await enricher.enrich(batch)
+        except asyncio.CancelledError:
+            # A hedged primary lost the race; it took at least this long
+            if enricher is self.primary and clock.sent_at is not None:
+                self.latencies.append(time.perf_counter() - clock.sent_at)
+            raise
+        except Exception as e:
+            print(f"{enricher.name} request failed: {e!r}")
+            return [{**t, "term_definition": None, "error": str(e)} for t in batch]
+        if enricher is self.primary and clock.sent_at is not None:
+            self.latencies.append(time.perf_counter() - clock.sent_at)
+        return records
+
+    async def _first_answer(self, batch):
+        """Primary answer, or the first complete answer once the batch is hedged."""
+        clock = RequestClock()
+        primary_task = asyncio.create_task(self._call(self.primary, batch, clock))
+        delay = self.hedge_delay()
+        if delay is None:
+            return await primary_task, self.primary
+
+        # The hedge timer starts once the primary request is sent, not while it queues
+        sent = asyncio.create_task(clock.sent.wait())
+        await asyncio.wait({primary_task, sent}, return_when=asyncio.FIRST_COMPLETED)
+        sent.cancel()
+        if not primary_task.done():
+            remaining = delay - (time.perf_counter() - clock.sent_at)
+            await asyncio.wait({primary_task}, timeout=max(0.0, remaining))
+        if primary_task.done():
+            return primary_task.result(), self.primary
+
+        self.hedged += 1
+        secondary_task = asyncio.create_task(self._call(self.secondary, batch))
+        providers = {primary_task: self.primary, secondary_task: self.secondary}
+        pending = set(providers)
+        answers = {}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                answers[task] = task.result()
+                if all(is_enriched(r) for r in answers[task]):
+                    for other in pending:
+                        other.cancel()
+                    if task is secondary_task:
+                        self.hedges_won += 1
+                    return answers[task], providers[task]
+
+        # Neither answer is complete; the one enriching more terms wins
+        best = max(answers, key=lambda task: sum(is_enriched(r) for r in answers[task]))
+        if best is secondary_task:
+            self.hedges_won += 1
+        return answers[best], providers[best]
+
+    async def enrich_batch(self, batch):
+        """
+        Enrich one batch.
+        Returns a list of (record, enricher that produced it) per term.
+        """
+        records, answered_by = await self._first_answer(batch)
+        results = list(zip(records, [answered_by] * len(records)))
+
+        other = self.secondary if answered_by is self.primary else self.primary
+        failed = [i for i, (record, _) in enumerate(results) if not is_enriched(record)]
+        if failed and other is not None:
+            self.fallbacks += len(failed)
+            retried = await self._call(other, [batch[i] for i in failed])
+            for i, record in zip(failed, retried):
+                if is_enriched(record):
+                    results[i] = (record, other)
+        return results
+
+    async def enrich_terms(self, term_candidates, batch_token_budget=ENRICHMENT_BATCH_TOKEN_BUDGET,
+                           batch_max_terms=ENRICHMENT_BATCH_MAX_TERMS, cache=None):
+        """Enrich every term: cached answers first, the rest in routed batches."""
+        cache = cache or LLMCache()
+        enrichers = [e for e in (self.primary, self.secondary) if e is not None]
+        results = [None] * len(term_candidates)
+
+        # Terms without context cannot be enriched
+        pending = []
+        for i, t in enumerate(term_candidates):
+            if term_contexts(t):
+                pending.append(i)
+            else:
+                results[i] = {**t, "term_definition": None, "error": "no context"}
+
+        keys = {}
+        for enricher in enrichers:
+            keys[enricher] = term_cache_keys(enricher.name, enricher.model, [term_candidates[i] for i in pending])
+            found = cache.get_many(keys[enricher])
+            still_pending = []
+            for i, key in zip(pending, keys[enricher]):
+                if key in found:
+                    results[i] = enriched_record(term_candidates[i], found[key])
+                else:
+                    still_pending.append(i)
+            keys[enricher] = {i: k for i, k in zip(pending, keys[enricher])}
+            pending = still_pending
+
+        start = time.perf_counter()
+        if batch_token_budget > 0:
+            batches = plan_batches([term_candidates[i] for i in pending], batch_token_budget, batch_max_terms)
+        else:
+            batches = [[term_candidates[i]] for i in pending]
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+
+        async def routed(batch):
+            async with in_flight:
+                return await self.enrich_batch(batch)
+
+        batch_results = await asyncio.gather(*(routed(b) for b in batches))
+
+        answered = [pair for pairs in batch_results for pair in pairs]
+        for enricher in enrichers:
+            mine = [(i, record) for i, (record, by) in zip(pending, answered) if by is enricher]
+            enricher.stats.terms = len(mine)
+            store_results(cache, enricher.name, enricher.model,
+                          [keys[enricher][i] for i, _ in mine], [record for _, record in mine])
+        for i, (record, _) in zip(pending, answered):
+            results[i] = record
+
+        print(f"Enrichment routing: {self.report(time.perf_counter() - start)}, cache: {cache.stats()}")
+        return results
+
+    async def aclose(self):
+        """Close the enrichers' clients; call on the loop that ran the requests."""
+        for enricher in (self.primary, self.secondary):
+            if enricher is not None:
+                await enricher.aclose()
+
+    def report(self, seconds=None):
+        report = {
+            "primary": f"{self.primary.name}/{self.primary.model}",
+            "secondary": f"{self.secondary.name}/{self.secondary.model}" if self.secondary else None,
+            "hedge_delay": round(self.hedge_delay(), 3) if self.hedge_delay() is not None else None,
+            "hedged": self.hedged,
+            "hedges_won": self.hedges_won,
+            "fallback_terms": self.fallbacks,
+        }
+        if seconds is not None:
+            report["seconds"] = round(seconds, 2)
+        # Keyed by role: both roles may use the same provider
+        for role, enricher in (("primary", self.primary), ("secondary", self.secondary)):
+            if enricher is not None:
+                report[f"{role}_stats"] = enricher.report()
+        return report
+
+
+def build_router(primary=ENRICHMENT_PROVIDER, secondary=ENRICHMENT_FALLBACK_PROVIDER, **kwargs):
+    """Router over the configured primary and (optional) secondary providers."""
+    return EnrichmentRouter(get_enricher(primary), get_enricher(secondary) if secondary else None, **kwargs)
@@ -0,0 +1,62 @@
+"""
+Deterministic local stand-in for the LLM enrichers.
+
+Answers are derived from the term and its contexts only, so runs are
+reproducible and need no network or API key. Used to test and benchmark
+the enrichment stage offline (ENRICHMENT_PROVIDER=stub). StubEnricher's
+latency may be a callable, to simulate slow or uneven providers.
+"""
+import asyncio
+import hashlib
+
+from enrichment.batching import term_contexts, enriched_record
+from enrichment.rate_limiter import mark_request_sent
+from enrichment.enricher import Enricher
+from utils.constants import STUB_LATENCY_SECONDS, ENRICHMENT_MAX_CONCURRENCY
+
+PROVIDER = "stub"
+MODEL_NAME = "stub-v1"
+
+
+def stub_enrichment(term_obj):
+    """The stub's answer for one term: same input, same output."""
+    term = term_obj["term"]
+    contexts = term_contexts(term_obj)
+    digest = hashlib.sha256(term.encode("utf-8")).hexdigest()
+    words = term.split()
+    return {
+        "term_definition": f"{term.capitalize()} as used in the source document (ref {digest[:8]}).",
+        "business_domain": term_obj.get("domain_name") or "Unknown",
+        "synonyms": [" ".join(reversed(words))] if len(words) > 1 else [],
+        "term_context": contexts[0] if contexts else None,
+    }
+
+
+async def enrich_single_term(term_obj, latency=STUB_LATENCY_SECONDS):
+    if not term_contexts(term_obj):
+        return {**term_obj, "term_definition": None, "error": "no context"}
+    if latency:
+        await asyncio.sleep(latency)
+    return enriched_record(term_obj, stub_enrichment(term_obj))
+
+
+class StubEnricher(Enricher):
+    """The stub behind the common enricher interface; one simulated request per batch."""
+
+    name = PROVIDER
+
+    def __init__(self, model=MODEL_NAME, latency=STUB_LATENCY_SECONDS, requests_per_minute=10**6,
+                 concurrency=ENRICHMENT_MAX_CONCURRENCY):
+        super().__init__(model, requests_per_minute, concurrency=concurrency)
+        self.latency = latency
+
+    async def enrich(self, batch):
+        async with self.concurrency:
+            await self.limiter.acquire()
+            mark_request_sent()
+            self.stats.requests += 1
+            latency = self.latency() if callable(self.latency) else self.latency
+            if latency:
+                await asyncio.sleep(latency)
+        self.concurrency.on_success()
+        return [await enrich_single_term(t, latency=0) for t in batch]
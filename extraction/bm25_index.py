@@ -0,0 +1,58 @@
+"""
+Inverted index with BM25 scoring over lemmatized paragraphs.
+
+Used as the first stage of context matching: it shortlists the paragraphs
+that share lemmas with a term, so only the shortlist is re-ranked with
+sentence embeddings.
+"""
+import math
+from collections import Counter, defaultdict
+
+import numpy as np
+
+
+class BM25Index:
+    def __init__(self, documents, k1=1.5, b=0.75):
+        """
+        Args:
+            documents: list of token lists (one per paragraph).
+        """
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(documents)
+        self.doc_lengths = np.array([len(tokens) for tokens in documents], dtype=np.float32)
+        self.avg_length = float(self.doc_lengths.mean()) if self.n_docs else 0.0
+
+        postings = defaultdict(lambda: ([], []))
+        for doc_id, tokens in enumerate(documents):
+            for token, tf in Counter(tokens).items():
+                ids, tfs = postings[token]
+                ids.append(doc_id)
+                tfs.append(tf)
+        self.postings = {
+            token: (np.array(ids, dtype=np.int64), np.array(tfs, dtype=np.float32))
+            for token, (ids, tfs) in postings.items()
+        }
+
+    def idf(self, token):
+        df = len(self.postings[token][0]) if token in self.postings else 0
+        return math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+
+    def scores(self, query_tokens):
+        """BM25 score of every document for `query_tokens` (dense array)."""
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for token in set(query_tokens):
+            if token not in self.postings:
+                continue
+            ids, tfs = self.postings[token]
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[ids] / (self.avg_length or 1.0))
+            scores[ids] += self.idf(token) * tfs * (self.k1 + 1) / (tfs + norm)
+        return scores
+
+    def shortlist(self, query_tokens, size):
+        """Ids of the (at most) `size` best matching documents; only documents with a positive score."""
+        scores = self.scores(query_tokens)
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) > size:
+            hits = hits[np.argpartition(-scores[hits], size - 1)[:size]]
+        return hits[np.argsort(-scores[hits], kind="stable")]
@@ -1,20 +1,24 @@
 # semantic_filter.py
-import spacy
 import numpy as np
 
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import util
 from sklearn.metrics.pairwise import cosine_similarity
-from utils.constants import SENTENCE_MODEL, NLP_MODEL_LARGE
+from utils.model_registry import get_nlp
+from utils.embedding_cache import encode_texts
+from utils.constants import VECTOR_INDEX_RECALL_SAMPLE, CONTEXT_SHORTLIST_SIZE, CONTEXT_TERM_CHUNK_SIZE
+from preprocessing.tokenizer import lemmatize_terms
+from extraction.bm25_index import BM25Index
 
-model = SentenceTransformer(SENTENCE_MODEL)
-
-nlp = spacy.load(NLP_MODEL_LARGE)
-
-def semantic_similarity_filter(candidate_terms, reference_terms, threshold=0.65):
+def semantic_similarity_filter(candidate_terms, reference_terms, threshold=0.65, reference_index=None):
     """
     Compare candidate business terms with validated reference terms.
     If a candidate term is semantically similar (>= threshold) to a reference term,
     it will be ignored (already known).
+
+    When a ReferenceTermIndex is given, its persisted reference embeddings are
+    searched with its configured vector index (exact or approximate) instead
+    of encoding `reference_terms` again. For an approximate index the recall
+    on a sample of candidates is printed.
     
     Returns:
         filtered_terms: list of dicts
@@ -32,9 +36,26 @@ def semantic_similarity_filter(candidate_terms, reference_terms, threshold=0.65)
         # If no reference, all candidates are kept
         return [{"term": t, "semantic_score": 0.0, "matched_reference": None} for t in candidate_terms]
 
+    if reference_index is not None and len(reference_index):
+        cand_embeddings = encode_texts(candidate_terms)
+        best_idx, best_scores = reference_index.best_matches(cand_embeddings)
+        if VECTOR_INDEX_RECALL_SAMPLE and reference_index.search_index.backend != "exact":
+            recall = reference_index.recall(cand_embeddings, sample_size=VECTOR_INDEX_RECALL_SAMPLE)
+            print(f"Reference index ({reference_index.search_index.backend}) recall@1: {recall:.3f}")
+        filtered_terms = [
+            {
+                "term": term,
+                "semantic_score": float(score),
+                "matched_reference": reference_index.terms[int(idx)]
+            }
+            for term, idx, score in zip(candidate_terms, best_idx, best_scores)
+            if score < threshold
+        ]
+        return sorted(filtered_terms, key=lambda x: x["semantic_score"])
+
     # Encode terms
-    cand_embeddings = model.encode(candidate_terms, convert_to_tensor=True)
-    ref_embeddings = model.encode(reference_terms, convert_to_tensor=True)
+    cand_embeddings = encode_texts(candidate_terms)
+    ref_embeddings = encode_texts(reference_terms)
 
     # Compute cosine similarities
     similarities = util.cos_sim(cand_embeddings, ref_embeddings)
@@ -69,6 +90,7 @@ def merge_by_semantics(linguistic_terms, tfidf_scores, threshold=0.8):
     used = set()
 
     # Precompute embeddings
+    nlp = get_nlp()
     tfidf_vecs = [nlp(t).vector for t in tfidf_terms]
     ling_terms_flat = [term for plist in linguistic_terms for term in plist]
     ling_vecs = [nlp(t).vector for t in ling_terms_flat]
@@ -91,10 +113,74 @@ def merge_by_semantics(linguistic_terms, tfidf_scores, threshold=0.8):
     return list(merged_terms)
 
 
-def match_semantic_context(term_candidates, normalized_text, threshold=0.5, top_k=3):
+def _top_k_rows(sims, k):
+    """Per row, the indices and scores of the k highest entries (descending); -inf entries are padding."""
+    k = min(k, sims.shape[1])
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(sims, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def _normalize(embeddings):
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+def rank_contexts(term_embeddings, paragraph_embeddings, shortlists, top_k, chunk_size=CONTEXT_TERM_CHUNK_SIZE):
+    """
+    Top-k paragraphs per term by cosine similarity (unit-normalized inputs).
+
+    Terms with a shortlist (array of paragraph ids) are only compared with
+    those paragraphs; terms whose shortlist is None are compared with all
+    paragraphs. Terms are scored `chunk_size` at a time, so the full
+    terms x paragraphs matrix is never built.
+
+    Returns:
+        list of (paragraph ids, scores) per term, best first.
+    """
+    results = [None] * len(term_embeddings)
+
+    dense = [i for i, s in enumerate(shortlists) if s is None]
+    for start in range(0, len(dense), chunk_size):
+        rows = dense[start:start + chunk_size]
+        sims = term_embeddings[rows] @ paragraph_embeddings.T
+        top, scores = _top_k_rows(sims, top_k)
+        for row, ids, row_scores in zip(rows, top, scores):
+            results[row] = (ids, row_scores)
+
+    sparse = [i for i, s in enumerate(shortlists) if s is not None]
+    for start in range(0, len(sparse), chunk_size):
+        rows = sparse[start:start + chunk_size]
+        width = max(1, max(len(shortlists[r]) for r in rows))
+        # Shortlists padded to a common width; padding (-1) scores -inf
+        ids = np.full((len(rows), width), -1, dtype=np.int64)
+        for n, r in enumerate(rows):
+            ids[n, :len(shortlists[r])] = shortlists[r]
+        gathered = paragraph_embeddings[np.maximum(ids, 0)]  # (c, width, dim)
+        sims = np.einsum("cwd,cd->cw", gathered, term_embeddings[rows])
+        sims[ids < 0] = -np.inf
+        top, scores = _top_k_rows(sims, top_k)
+        for n, r in enumerate(rows):
+            keep = np.isfinite(scores[n])
+            results[r] = (ids[n][top[n]][keep], scores[n][keep])
+
+    return results
+
+
+def match_semantic_context(term_candidates, normalized_text, threshold=0.5, top_k=3,
+                           shortlist_size=CONTEXT_SHORTLIST_SIZE):
     """
     Efficiently match candidate business terms with their most semantically relevant paragraph context.
 
+    A BM25 index over the paragraph lemmas first shortlists up to
+    `shortlist_size` paragraphs per term; only the shortlist is re-ranked
+    with sentence embeddings. A term sharing no lemma with any paragraph
+    gets no context (the count of such terms is printed), so a term's result
+    never depends on the other terms of the batch. Documents no larger than
+    the shortlist are scored exactly.
+
     Args:
         term_candidates (list[dict]): List of candidate terms, each with at least {"term": "..."}.
         normalized_text (list[dict]): Preprocessed text data with "original_sentence" and "lemmatized_sentence".
@@ -112,49 +198,67 @@ def match_semantic_context(term_candidates, normalized_text, threshold=0.5, top_
         print("normalized_text is empty or invalid")
         return []
 
-    # --- Prepare clean paragraphs ---
+    # --- Prepare clean paragraphs (remembering their position in normalized_text) ---
+    para_records = [
+        p for p in normalized_text
+        if p.get('original_sentence') or p.get('lemmatized_sentence')
+    ]
     paragraphs = [
         f"{p.get('original_sentence', '')} {p.get('lemmatized_sentence', '')}".strip()
-        for p in normalized_text
-        if p.get('original_sentence') or p.get('lemmatized_sentence')
+        for p in para_records
     ]
     if not paragraphs:
         print("No valid paragraphs found for context matching.")
         return []
 
     # --- Prepare valid term list ---
-    term_texts = [
-        t["term"].strip()
-        for t in term_candidates
-        if isinstance(t, dict) and "term" in t and t["term"].strip()
+    candidates = [
+        t for t in term_candidates
+        if isinstance(t, dict) and isinstance(t.get("term"), str) and t["term"].strip()
     ]
+    term_texts = [t["term"].strip() for t in candidates]
     if not term_texts:
         print("No valid terms found in term_candidates.")
         return []
 
-    # --- Encode all paragraphs and terms once ---
-    paragraph_embeddings = model.encode(paragraphs, convert_to_tensor=True)
-    term_embeddings = model.encode(term_texts, convert_to_tensor=True)
-
-    # --- Compute cosine similarity matrix (terms × paragraphs) ---
-    sims = util.cos_sim(term_embeddings, paragraph_embeddings)
+    # --- First stage: BM25 shortlist over paragraph lemmas ---
+    if len(paragraphs) <= shortlist_size:
+        shortlists = [None] * len(term_texts)
+        needed = np.arange(len(paragraphs))
+    else:
+        bm25 = BM25Index([p.get("tokens") or p.get("lemmatized_sentence", "").split() for p in para_records])
+        shortlists = [
+            bm25.shortlist(tokens, shortlist_size) if tokens else np.array([], dtype=np.int64)
+            for tokens in lemmatize_terms(term_texts)
+        ]
+        unmatched = sum(1 for s in shortlists if not len(s))
+        if unmatched:
+            print(f"{unmatched} terms share no lemma with any paragraph; no context matched for them.")
+        # Only the paragraphs some term shortlisted are encoded
+        needed = np.unique(np.concatenate(shortlists))
+        if not len(needed):
+            return []
+
+    # --- Encode terms and the needed paragraphs ---
+    position = np.full(len(paragraphs), -1, dtype=np.int64)
+    position[needed] = np.arange(len(needed))
+
+    paragraph_embeddings = _normalize(encode_texts([paragraphs[i] for i in needed]))
+    term_embeddings = _normalize(encode_texts(term_texts))
+    local_shortlists = [None if s is None else position[s] for s in shortlists]
+
+    # --- Second stage: embedding re-rank, chunked top-k ---
+    ranked = rank_contexts(term_embeddings, paragraph_embeddings, local_shortlists, top_k)
 
     enriched_terms = []
-    for i, candidate in enumerate(term_candidates):
-        # Skip invalid ones
-        if "term" not in candidate or not candidate["term"]:
-            continue
-
-        # Get top-k highest scoring paragraph indices
-        top_indices = sims[i].topk(k=min(top_k, len(paragraphs))).indices.tolist()
+    for candidate, (local_ids, scores) in zip(candidates, ranked):
         contexts = []
-
-        for idx in top_indices:
-            score = float(sims[i][idx])
+        for local_id, score in zip(local_ids, scores):
+            score = float(score)
             if score < threshold:
                 continue  # skip weak matches
 
-            matched_para = normalized_text[idx]
+            matched_para = para_records[needed[local_id]]
             original = matched_para.get("original_sentence", "").strip()
             lemmatized = matched_para.get("lemmatized_sentence", "").strip()
 
@@ -2,6 +2,7 @@ import re, json
 from typing import Dict
 from extraction.semantic_function import semantic_similarity_filter, match_semantic_context
 from services.term_repository import BusinessTermRepository
+from services.reference_term_index import get_reference_index
 
 repo = BusinessTermRepository()
 
@@ -31,8 +32,11 @@ def extract_terms(preprocessed_data):
         print("All candidate terms already exist in the reference glossary.")
         return []
 
-    # Semantic
-    cleansed_terms = semantic_similarity_filter(deduplicated_candidates, reference_terms)
+    # Semantic (reference embeddings come from the persisted index)
+    reference_index = get_reference_index()
+    reference_index.sync(reference_terms)
+    cleansed_terms = semantic_similarity_filter(deduplicated_candidates, reference_terms,
+                                                reference_index=reference_index)
     
     # Combine scores
     for t in cleansed_terms:
@@ -22,12 +22,24 @@ async function handleResponse<T>(response: Response): Promise<T> {
   return response.json() as Promise<T>;
 }
 
+// List endpoints return one page per request; the next page's cursor is in
+// the X-Next-Cursor header (absent on the last page).
+async function fetchAllPages<T>(path: string): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const url = cursor ? `${BASE_URL}${path}?cursor=${encodeURIComponent(cursor)}` : `${BASE_URL}${path}`;
+    const res = await fetch(url);
+    items.push(...(await handleResponse<T[]>(res)));
+    cursor = res.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return items;
+}
+
 export async function fetchBusinessDomains(): Promise<BusinessDomain[]> {
-  const res = await fetch(`${BASE_URL}/api/business-domain`);
-  return handleResponse<BusinessDomain[]>(res);
+  return fetchAllPages<BusinessDomain>("/api/business-domain");
 }
 
 export async function fetchBusinessGlossary(): Promise<BusinessTerm[]> {
-  const res = await fetch(`${BASE_URL}/api/business-glossary`);
-  return handleResponse<BusinessTerm[]>(res);
+  return fetchAllPages<BusinessTerm>("/api/business-glossary");
 }
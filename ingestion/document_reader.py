@@ -1,13 +1,24 @@
-import re
 import fitz  # PyMuPDF
-from collections import Counter
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 
 from docx import Document
-from pdf2docx import Converter
 import os
-
-from ingestion.language_detector import detect_language
-from ingestion.translator import translate_to_english
+import tempfile
+
+from ingestion.language_detector import detect_language, detect_language_paragraphs
+from ingestion.translator import translate_to_english, translate_paragraphs
+from ingestion.text_normalizer import clean_text_normalizer, pdf_block_normalizer
+from utils.constants import (
+    PDF_ENGINE,
+    PDF_WORKERS,
+    PDF_PARALLEL_MIN_PAGES,
+    PDF_PAGES_PER_TASK,
+    PDF_HEADER_SAMPLE_PAGES,
+    LANGUAGE_SAMPLE_PARAGRAPHS,
+    TRANSLATION_WINDOW_PARAGRAPHS,
+)
 
 
 def read_and_prepare_document(file_path: str) -> str:
@@ -28,114 +39,214 @@ def read_and_prepare_document(file_path: str) -> str:
 
     return text_en
 
-def read_pdf_clean(path, min_line_length=5, header_footer_threshold=0.6):
+def _extract_pdf_pages(path, start, end):
     """
-    Read a PDF and remove repetitive headers/footers.
-    Returns clean text paragraphs.
+    Extract text blocks for pages [start, end) of a PDF.
+    Runs inside worker processes, so it opens its own document handle.
+    Returns a list (one item per page) of paragraphs, each a list of stripped lines.
     """
-    doc = fitz.open(path)
-    pages_text = []
-    line_counter = Counter()
+    pages = []
+    with fitz.open(path) as doc:
+        for page_no in range(start, end):
+            paragraphs = []
+            # blocks: (x0, y0, x1, y1, text, block_no, block_type); type 0 is text
+            for block in doc[page_no].get_text("blocks", sort=True):
+                if block[6] != 0:
+                    continue
+                lines = [l.strip() for l in block[4].splitlines() if l.strip()]
+                if lines:
+                    paragraphs.append(lines)
+            pages.append(paragraphs)
+    return pages
+
+
+def _iter_pdf_pages(path, num_pages, workers):
+    """
+    Yield the pages of a PDF in order. Page ranges are extracted by worker
+    processes with a bounded look-ahead, so only a few ranges are held at once.
+    """
+    if workers is None:
+        workers = PDF_WORKERS
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    ranges = [(start, min(start + PDF_PAGES_PER_TASK, num_pages))
+              for start in range(0, num_pages, PDF_PAGES_PER_TASK)]
+
+    if workers <= 1 or len(ranges) <= 1 or num_pages < PDF_PARALLEL_MIN_PAGES:
+        for start, end in ranges:
+            yield from _extract_pdf_pages(path, start, end)
+        return
+
+    workers = min(workers, len(ranges))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        next_range = 0
+        while pending or next_range < len(ranges):
+            while next_range < len(ranges) and len(pending) < 2 * workers:
+                pending.append(executor.submit(_extract_pdf_pages, path, *ranges[next_range]))
+                next_range += 1
+            yield from pending.popleft().result()
+
+
+def _detect_pdf_header_footer(path, num_pages, min_line_length, header_footer_threshold):
+    """
+    Find lines that repeat on more than `header_footer_threshold` of the pages.
+    Long documents are judged on an evenly spaced sample of pages.
+    """
+    # Needs a few pages to tell a running header apart from ordinary content
+    if num_pages < 3:
+        return set()
 
-    # Step 1: Extract text and record lines
-    for page in doc:
-        text = page.get_text("text")
-        lines = [l.strip() for l in text.splitlines() if len(l.strip()) > min_line_length]
-        pages_text.append(lines)
-        line_counter.update(lines)
+    sample_size = min(num_pages, PDF_HEADER_SAMPLE_PAGES)
+    sample = sorted({round(i * (num_pages - 1) / max(sample_size - 1, 1)) for i in range(sample_size)})
+    line_counter = Counter()
+    with fitz.open(path) as doc:
+        for page_no in sample:
+            lines = doc[page_no].get_text("text").splitlines()
+            line_counter.update({l.strip() for l in lines if len(l.strip()) > min_line_length})
 
-    # Step 2: Detect likely header/footer lines (appear in > threshold of pages)
-    num_pages = len(pages_text)
-    common_lines = {
+    return {
         line for line, count in line_counter.items()
-        if count / num_pages > header_footer_threshold
+        if count / len(sample) > header_footer_threshold
     }
 
-    # Step 3: Rebuild document text without those lines
-    cleaned_pages = []
-    for lines in pages_text:
-        cleaned_lines = [l for l in lines if l not in common_lines]
-        cleaned_text = " ".join(cleaned_lines)
-        cleaned_pages.append(cleaned_text)
 
-    full_text = "\n\n".join(cleaned_pages)
+def iter_pdf_paragraphs(path, min_line_length=5, header_footer_threshold=0.6, workers=None):
+    """
+    Stream the paragraphs (PDF text blocks) of a PDF read with PyMuPDF,
+    with repetitive headers/footers removed.
+    Yields dicts: {"text", "page" (1-based), "position" (index in document)}.
+    """
+    with fitz.open(path) as doc:
+        num_pages = doc.page_count
+    if num_pages == 0:
+        return
 
-    # Optional: Remove page numbers or standalone digits
-    full_text = re.sub(r'\bpage\s*\d+(\s*of\s*\d+)?\b', '', full_text, flags=re.IGNORECASE)
-    full_text = re.sub(r'\b\d{1,3}\b', '', full_text)
+    common_lines = _detect_pdf_header_footer(path, num_pages, min_line_length, header_footer_threshold)
 
-    return full_text
+    position = 0
+    for page_no, paragraphs in enumerate(_iter_pdf_pages(path, num_pages, workers), start=1):
+        for lines in paragraphs:
+            text = " ".join(l for l in lines if l not in common_lines)
+            # Remove page numbers or standalone digits
+            text = pdf_block_normalizer.normalize(text)
+            if len(text) > min_line_length:
+                yield {"text": text, "page": page_no, "position": position}
+                position += 1
 
 
-def get_main_body_from_file(file_path: str) -> str:
+def read_pdf_paragraphs(path, min_line_length=5, header_footer_threshold=0.6, workers=None):
     """
-    Checks the file extension and extracts a list of paragraphs.
-    If the file is a PDF, it is first converted to a temporary DOCX file.
+    Read a PDF with PyMuPDF, page-parallel, and remove repetitive headers/footers.
+    Returns a list of clean text paragraphs (PDF text blocks) in document order.
     """
-    file_extension = os.path.splitext(file_path)[1].lower().strip()
-    full_text = ""
+    return [p["text"] for p in iter_pdf_paragraphs(path, min_line_length, header_footer_threshold, workers)]
 
-    try:
-        if file_extension == '.pdf':
-            temp_docx_path = file_path.replace('.pdf', '_temp.docx')
-            cv = Converter(file_path)
-            cv.convert(temp_docx_path, start=0, end=None)
-            cv.close()
-            file_path = temp_docx_path  # reuse below
-
-        if file_extension in ['.pdf', '.docx']:
-            doc = Document(file_path)
-            paragraphs = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
-            full_text = "\n\n".join(paragraphs)
-
-            # Cleanup if temporary
-            if file_path.endswith('_temp.docx'):
-                os.remove(file_path)
 
-        else:
-            print(f"Unsupported file type: {file_extension}")
+def read_pdf_clean(path, min_line_length=5, header_footer_threshold=0.6, workers=None):
+    """
+    Read a PDF and remove repetitive headers/footers.
+    Returns clean text, paragraphs separated by blank lines.
+    """
+    return "\n\n".join(read_pdf_paragraphs(path, min_line_length, header_footer_threshold, workers))
 
-    except Exception as e:
-        print(f"Error processing {file_path}: {e}")
 
-    return full_text
+def _read_pdf_via_docx(file_path: str):
+    """
+    Legacy PDF route: convert to a temporary DOCX with pdf2docx and read it back.
+    Only used when PDF_ENGINE is set to "pdf2docx".
+    """
+    from pdf2docx import Converter
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        temp_docx_path = os.path.join(tmp_dir, "converted.docx")
+        cv = Converter(file_path)
+        cv.convert(temp_docx_path, start=0, end=None)
+        cv.close()
+        doc = Document(temp_docx_path)
+        return [p.text.strip() for p in doc.paragraphs if p.text.strip()]
 
-def clean_text(raw_text: str) -> str:
+
+def iter_docx_paragraphs(path):
     """
-    Clean and normalize text extracted from business documents.
-    Removes page numbers, dates, boilerplate headers/footers, and noisy symbols.
+    Stream the non-empty paragraphs of a DOCX file.
+    Yields dicts: {"text", "page" (None, DOCX has no fixed pages), "position"}.
+    """
+    doc = Document(path)
+    position = 0
+    for paragraph in doc.paragraphs:
+        text = paragraph.text.strip()
+        if text:
+            yield {"text": text, "page": None, "position": position}
+            position += 1
+
+
+def iter_document_paragraphs(file_path: str):
+    """
+    Lazily yield the paragraphs of a PDF or DOCX file with page/position metadata.
+    PDFs are read natively with PyMuPDF; set PDF_ENGINE=pdf2docx to go through
+    a temporary DOCX conversion instead.
     """
-    text = raw_text or ""
-    text = text.strip()
+    file_extension = os.path.splitext(file_path)[1].lower().strip()
+
+    if file_extension == '.pdf':
+        if PDF_ENGINE == "pdf2docx":
+            for position, text in enumerate(_read_pdf_via_docx(file_path)):
+                yield {"text": text, "page": None, "position": position}
+        else:
+            yield from iter_pdf_paragraphs(file_path)
 
-    # Remove common header/footer phrases
-    header_footer_patterns = [
-        r'page\s*\d+(\s*of\s*\d+)?',      # "Page 1", "Page 1 of 10"
-        r'\bconfidential\b',              # "Confidential", "Internal Use Only"
-        r'\bbrd\b', r'\bsrs\b',           # document types like BRD/SRS
-        r'\bversion\s*\d+(\.\d+)?',       # "Version 1.0"
-        r'copyright\s*\d{4}',             # "Copyright xxxx"
-    ]
-    for pattern in header_footer_patterns:
-        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    elif file_extension == '.docx':
+        yield from iter_docx_paragraphs(file_path)
 
-    # Remove URLs, emails, and file paths
-    text = re.sub(r'http\S+|www\.\S+', '', text)
-    text = re.sub(r'\S+@\S+', '', text)
-    text = re.sub(r'[A-Za-z]:\\[^\\\s]+', '', text)  # Windows paths
+    else:
+        print(f"Unsupported file type: {file_extension}")
 
-    # Remove isolated numbers, codes, and noise like "23", "2017 20 03"
-    text = re.sub(r'\b\d{1,4}\b', '', text)
-    text = re.sub(r'\b\d+[/-]\d+[/-]?\d*\b', '', text)  # date-like tokens
 
-    # Remove special symbols but keep sentence structure
-    text = re.sub(r'[^a-zA-Z0-9\s.,%-]', ' ', text)
+def iter_prepared_paragraphs(file_path: str, sample_size=LANGUAGE_SAMPLE_PARAGRAPHS,
+                             window=TRANSLATION_WINDOW_PARAGRAPHS):
+    """
+    Streaming counterpart of read_and_prepare_document.
+    Detects the language on the first `sample_size` paragraphs and yields
+    paragraph dicts with English text. Non-English paragraphs are translated
+    `window` at a time, with the chunks of a window sent concurrently.
+    """
+    paragraphs = iter_document_paragraphs(file_path)
+    head = list(islice(paragraphs, sample_size))
+    if not head:
+        return
+
+    lang = detect_language_paragraphs([p["text"] for p in head])
+    if lang == "en":
+        yield from chain(head, paragraphs)
+        return
+
+    print(f"Detected non-English document ({lang}), translating...")
+    paragraphs = chain(head, paragraphs)
+    while True:
+        batch = list(islice(paragraphs, window))
+        if not batch:
+            break
+        translated = translate_paragraphs([p["text"] for p in batch], src_lang=lang)
+        for paragraph, text in zip(batch, translated):
+            yield {**paragraph, "text": text}
 
-    # Collapse multiple spaces or newlines
-    text = re.sub(r'\s+', ' ', text)
 
-    # Trim extra punctuation
-    text = re.sub(r'\s([?.!,:;])', r'\1', text)
-    text = re.sub(r'([?.!,:;])\1+', r'\1', text)  # remove duplicates like "!!"
+def get_main_body_from_file(file_path: str) -> str:
+    """
+    Checks the file extension and extracts a list of paragraphs.
+    Returns them as one string, separated by blank lines.
+    """
+    try:
+        return "\n\n".join(p["text"] for p in iter_document_paragraphs(file_path))
+    except Exception as e:
+        print(f"Error processing {file_path}: {e}")
+        return ""
 
-    return text.strip()
+def clean_text(raw_text: str) -> str:
+    """
+    Clean and normalize text extracted from business documents.
+    Removes page numbers, dates, boilerplate headers/footers, and noisy symbols.
+    See ingestion.text_normalizer.CLEAN_TEXT_RULES for the rules.
+    """
+    return clean_text_normalizer.normalize(raw_text)
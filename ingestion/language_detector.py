@@ -1,13 +1,29 @@
+import re
 from langdetect import detect, DetectorFactory
 
+from utils.constants import LANGUAGE_SAMPLE_PARAGRAPHS
+
 DetectorFactory.seed = 0  # make detection deterministic
 
 
+def sample_paragraphs(paragraphs, sample_size: int = LANGUAGE_SAMPLE_PARAGRAPHS):
+    """Pick up to `sample_size` non-empty paragraphs spread evenly over the document."""
+    paragraphs = [p for p in paragraphs if p and p.strip()]
+    if len(paragraphs) <= sample_size:
+        return paragraphs
+    step = len(paragraphs) / sample_size
+    return [paragraphs[int(i * step)] for i in range(sample_size)]
+
+
 def detect_language(text: str) -> str:
-    """Detect language code (e.g., 'en', 'vi')."""
+    """Detect language code (e.g., 'en', 'vi') from a sample of the paragraphs."""
+    paragraphs = re.split(r'\n\s*\n', text or "")
+    return detect_language_paragraphs(paragraphs)
+
+
+def detect_language_paragraphs(paragraphs) -> str:
+    """Detect language code from a sample of the given paragraphs."""
     try:
-        return detect(text)
+        return detect("\n\n".join(sample_paragraphs(paragraphs)))
     except Exception:
         return "vi" # As default value
-
-
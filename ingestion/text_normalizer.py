@@ -0,0 +1,94 @@
+"""
+Precompiled, reusable text normalization.
+
+A TextNormalizer applies an ordered list of regex rules compiled once at
+construction. Rules can carry literal guards: a rule whose guards do not
+occur in the (case-folded) text is skipped without scanning it with the
+regex. Adjacent patterns are merged only where that cannot change the
+result, so the output matches the original pass-by-pass implementation.
+
+Several patterns are rewritten to start with a literal or character class
+instead of a zero-width assertion, which lets the regex engine skip ahead
+quickly: `\bversion` becomes `v(?<!\w.)ersion` and `\b\d` becomes
+`\d(?<!\w\d)` (the lookbehind re-checks the word boundary).
+"""
+import re
+
+
+class TextNormalizer:
+    """Apply ordered (pattern, replacement) rules, compiled once."""
+
+    def __init__(self, rules):
+        """
+        Args:
+            rules: list of (pattern, replacement[, flags[, guards]]) where guards
+                is an optional list of lowercase literals, at least one of which
+                must appear in the text for the rule to run.
+        """
+        self.rules = []
+        for rule in rules:
+            pattern, replacement = rule[0], rule[1]
+            flags = rule[2] if len(rule) > 2 else 0
+            guards = rule[3] if len(rule) > 3 else None
+            if isinstance(pattern, str):
+                pattern = re.compile(pattern, flags)
+            self.rules.append((pattern, replacement, guards))
+
+    def normalize(self, text: str) -> str:
+        text = (text or "").strip()
+        folded = None
+        for pattern, replacement, guards in self.rules:
+            if guards:
+                if folded is None:
+                    folded = text.casefold()
+                if not any(g in folded for g in guards):
+                    continue
+            text, count = pattern.subn(replacement, text)
+            if count:
+                folded = None  # text changed, guards must look at the new text
+        return text.strip()
+
+    __call__ = normalize
+
+    def normalize_stream(self, paragraphs):
+        """Normalize an iterable of paragraphs lazily, one at a time."""
+        for paragraph in paragraphs:
+            yield self.normalize(paragraph)
+
+
+CLEAN_TEXT_RULES = [
+    # Common header/footer phrases
+    (r'page\s*\d+(\s*of\s*\d+)?', '', re.IGNORECASE, ["page"]),           # "Page 1", "Page 1 of 10"
+    # "Confidential" and document types like BRD/SRS; removing a whole word
+    # cannot create a match for another, so one pass is equivalent
+    (r'\b(?:confidential|brd|srs)\b', '', re.IGNORECASE, ["confidential", "brd", "srs"]),
+    (r'v(?<!\w.)ersion\s*\d+(\.\d+)?', '', re.IGNORECASE, ["version"]),  # "Version 1.0"
+    (r'copyright\s*\d{4}', '', re.IGNORECASE, ["copyright"]),            # "Copyright xxxx"
+
+    # Remove URLs, emails, and file paths
+    (r'http\S+|www\.\S+', '', 0, ["http", "www."]),
+    (r'\S+@\S+', '', 0, ["@"]),
+    (r'[A-Za-z]:\\[^\\\s]+', '', 0, [":\\"]),                             # Windows paths
+
+    # Remove isolated numbers, codes, and noise like "23", "2017 20 03"
+    (r'\d(?<!\w\d)\d{0,3}(?!\w)', ''),
+    (r'\d(?<!\w\d)\d*[/-]\d+[/-]?\d*\b', '', 0, ["/", "-"]),             # date-like tokens
+
+    # Special symbols become spaces and whitespace runs collapse, in one pass
+    # (the class is exactly "symbol or whitespace"); a lone space is left alone
+    (r'[^a-zA-Z0-9.,%-]{2,}|[^a-zA-Z0-9.,%\- ]', ' '),
+
+    # Trim extra punctuation
+    (r'\s([?.!,:;])', r'\1'),
+    (r'([?.!,:;])\1+', r'\1'),  # remove duplicates like "!!"
+]
+
+# Page markers ("Page 3 of 10") and standalone 1-3 digit numbers in PDF text
+# blocks, then whitespace collapsed
+PDF_BLOCK_RULES = [
+    (r'\bpage\s*\d+(\s*of\s*\d+)?\b|\b\d{1,3}\b', '', re.IGNORECASE),
+    (r'\s+', ' '),
+]
+
+clean_text_normalizer = TextNormalizer(CLEAN_TEXT_RULES)
+pdf_block_normalizer = TextNormalizer(PDF_BLOCK_RULES)
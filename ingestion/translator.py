@@ -1,9 +1,181 @@
-from googletrans import Translator
+import asyncio
+import hashlib
+import inspect
+import os
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 
-def translate_to_english(text: str, src_lang: str = None) -> str:
+from utils.constants import (
+    TRANSLATION_CHUNK_CHARS,
+    TRANSLATION_CONCURRENCY,
+    TRANSLATION_CACHE_PATH,
+)
+
+
+def _default_translator():
+    from googletrans import Translator
+    return Translator()
+
+
+# Factory for the translation client. Anything with a googletrans-style
+# translate(text, src=..., dest=...) method (sync or async) returning an
+# object with a .text attribute works, e.g. a local stand-in for tests.
+translator_factory = _default_translator
+
+
+class TranslationCache:
+    """Persistent translation cache (SQLite) keyed by a hash of (src, dest, chunk)."""
+
+    def __init__(self, path=TRANSLATION_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, text TEXT NOT NULL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def make_key(chunk, src_lang, dest):
+        return hashlib.sha256(f"{src_lang or 'auto'}\x1f{dest}\x1f{chunk}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        with self._connect() as conn:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(unique), 500):
+                batch = unique[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(f"SELECT key, text FROM translations WHERE key IN ({placeholders})", batch)
+                found.update(rows.fetchall())
+        self.hits += sum(1 for k in keys if k in found)
+        self.misses += sum(1 for k in keys if k not in found)
+        return found
+
+    def put_many(self, items):
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO translations (key, text) VALUES (?, ?)", items)
+
+
+def split_paragraph(paragraph: str, max_chars: int = TRANSLATION_CHUNK_CHARS):
+    """
+    Split one paragraph into chunks of at most `max_chars`, on sentence
+    boundaries where possible.
+    """
+    paragraph = paragraph.strip()
+    if len(paragraph) <= max_chars:
+        return [paragraph] if paragraph else []
+
+    chunks = []
+    current = ""
+    for sentence in re.split(r'(?<=[.!?])\s+', paragraph):
+        # A single overlong sentence is cut at max_chars
+        while len(sentence) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_into_chunks(text: str, max_chars: int = TRANSLATION_CHUNK_CHARS):
+    """Split text into paragraph-sized chunks of at most `max_chars`."""
+    return [c for p in re.split(r'\n\s*\n', text.strip()) for c in split_paragraph(p, max_chars)]
+
+
+async def _translate_one(translator, chunk, src_lang, dest, semaphore):
+    async with semaphore:
+        try:
+            if inspect.iscoroutinefunction(translator.translate):
+                result = await translator.translate(chunk, src=src_lang or "auto", dest=dest)
+            else:
+                result = await asyncio.to_thread(translator.translate, chunk, src=src_lang or "auto", dest=dest)
+            return result.text
+        except Exception as e:
+            print(f"Translation failed for chunk ({len(chunk)} chars), keeping original: {e}")
+            return None
+
+
+async def _translate_chunks_async(chunks, src_lang, dest, translator, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*[_translate_one(translator, c, src_lang, dest, semaphore) for c in chunks])
+
+
+def _run_async(coro):
+    """Run a coroutine from sync code, even when called inside a running event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def translate_chunks(chunks, src_lang: str = None, dest: str = "en", translator=None,
+                     concurrency: int = TRANSLATION_CONCURRENCY, cache: TranslationCache = None):
+    """
+    Translate a list of chunks concurrently (at most `concurrency` in flight),
+    serving repeated chunks from the persistent cache.
+    Returns the translations in input order; failed chunks are returned untranslated.
+    """
+    if not chunks:
+        return []
+    cache = cache or TranslationCache()
+    keys = [TranslationCache.make_key(c, src_lang, dest) for c in chunks]
+    cached = cache.get_many(keys)
+
+    pending = {}
+    for key, chunk in zip(keys, chunks):
+        if key not in cached and key not in pending:
+            pending[key] = chunk
+
+    if pending:
+        translator = translator or translator_factory()
+        translated = _run_async(_translate_chunks_async(list(pending.values()), src_lang, dest,
+                                                        translator, concurrency))
+        new_items = [(k, t) for k, t in zip(pending.keys(), translated) if t is not None]
+        cache.put_many(new_items)
+        cached.update(new_items)
+
+    return [cached.get(key, chunk) for key, chunk in zip(keys, chunks)]
+
+
+def translate_paragraphs(paragraphs, src_lang: str = None, dest: str = "en", translator=None):
+    """
+    Translate a list of paragraphs, one result per paragraph. Long paragraphs
+    are sent as several chunks and joined back together.
+    """
+    owners = []
+    chunks = []
+    for i, paragraph in enumerate(paragraphs):
+        for chunk in split_paragraph(paragraph):
+            owners.append(i)
+            chunks.append(chunk)
+
+    parts = [[] for _ in paragraphs]
+    for owner, translated in zip(owners, translate_chunks(chunks, src_lang=src_lang, dest=dest,
+                                                          translator=translator)):
+        parts[owner].append(translated)
+    return [" ".join(p) for p in parts]
+
+
+def translate_to_english(text: str, src_lang: str = None, translator=None) -> str:
     """Translate text to English if not already."""
     if not text.strip():
         return text
-    translator = Translator()
-    result = translator.translate(text, src=src_lang, dest="en")
-    return result.text
\ No newline at end of file
+    paragraphs = [p for p in re.split(r'\n\s*\n', text.strip()) if p.strip()]
+    return "\n\n".join(translate_paragraphs(paragraphs, src_lang=src_lang, translator=translator))
@@ -1,14 +1,24 @@
 """
 Main entry point for the Business Term Extraction pipeline.
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from api.routes import glossary_router, domain_router, process_router
+from models.db import get_pool_stats
+from models.async_db import get_async_pool_stats, dispose_async_engine
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await dispose_async_engine()
 
 
-app = FastAPI(title="Business Glossary API")
+app = FastAPI(title="Business Glossary API", lifespan=lifespan)
 
 app.include_router(glossary_router.router, prefix="/api")
 app.include_router(domain_router.router, prefix="/api")
@@ -22,12 +32,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # keyset pagination of the list endpoints
 )
 
 @app.get("/")
 def root():
     return {"message": "Welcome to the Business Glossary API"}
 
+@app.get("/api/health/db-pool")
+def db_pool_health():
+    """Database connection pool: connections in use, checkout wait times, timeouts."""
+    return get_pool_stats()
+
+@app.get("/api/health/async-db-pool")
+def async_db_pool_health():
+    """Same for the async engine of the read routes (null until first used)."""
+    return get_async_pool_stats()
+
 def main():
     print("🚀 Starting Business Term Extraction Pipeline...")
     uvicorn.run(app, host="0.0.0.0", port=8000)
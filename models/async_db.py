@@ -0,0 +1,107 @@
+"""
+Async engine and sessions for the API read routes.
+
+The async URL is ASYNC_DATABASE_URL, or DATABASE_URL with its driver swapped
+for the asyncio one (mysql+pymysql -> mysql+aiomysql, sqlite -> sqlite+aiosqlite).
+The engine is created on first use, so the async driver is only needed in
+processes that serve async routes. It has its own pool (ASYNC_DB_POOL_SIZE,
+ASYNC_DB_MAX_OVERFLOW), instrumented like the sync one (see
+models.db.get_pool_stats).
+"""
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from models.db import InstrumentedQueuePool, get_pool_stats
+from utils.constants import (
+    DATABASE_URL,
+    ASYNC_DATABASE_URL,
+    ASYNC_DB_POOL_SIZE,
+    ASYNC_DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_ECHO,
+)
+
+# Default asyncio driver per database backend, and the drivers accepted as async
+ASYNC_DRIVERS = {"mysql": "aiomysql", "sqlite": "aiosqlite"}
+ASYNC_DRIVER_NAMES = {"aiomysql", "asyncmy", "aiosqlite"}
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """InstrumentedQueuePool for asyncio engines."""
+
+
+def async_url(url=DATABASE_URL):
+    """`url` with the asyncio driver of its backend (unchanged if it already has one)."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if url.get_driver_name() in ASYNC_DRIVER_NAMES:
+        return url
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}; set ASYNC_DATABASE_URL")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def create_async_db_engine(url=None, pool_size=ASYNC_DB_POOL_SIZE, max_overflow=ASYNC_DB_MAX_OVERFLOW,
+                           pool_timeout=DB_POOL_TIMEOUT, pool_recycle=DB_POOL_RECYCLE,
+                           pool_pre_ping=DB_POOL_PRE_PING, echo=DB_ECHO):
+    """Async engine with an instrumented connection pool (in-memory SQLite keeps its default pool)."""
+    url = async_url(url or ASYNC_DATABASE_URL or DATABASE_URL)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return create_async_engine(url, echo=echo)
+    return create_async_engine(
+        url,
+        echo=echo,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
+    )
+
+
+_async_engine = None
+_async_sessionmaker = None
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_db_engine()
+    return _async_engine
+
+
+def get_async_sessionmaker():
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        _async_sessionmaker = async_sessionmaker(get_async_engine(), expire_on_commit=False)
+    return _async_sessionmaker
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """New async session on the shared async engine."""
+    return get_async_sessionmaker()()
+
+
+async def get_async_db():
+    """FastAPI dependency: one async session per request."""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def get_async_pool_stats():
+    """Pool statistics of the async engine, or None before it is first used."""
+    if _async_engine is None:
+        return None
+    return get_pool_stats(_async_engine.sync_engine)
+
+
+async def dispose_async_engine():
+    """Close the async engine's connections (on application shutdown)."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = _async_sessionmaker = None
@@ -1,3 +1,7 @@
+import hashlib
+import json
+import re
+
 from sqlalchemy import (
     Column,
     String,
@@ -8,30 +12,64 @@ from sqlalchemy import (
     Text,
     TIMESTAMP,
     JSON,
+    Index,
+    event,
     func
 )
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
 
+
+def _normalize(value):
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value.strip())
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_term_key(term, term_context):
+    """
+    Hash identifying a glossary entry: the term (case- and whitespace-
+    insensitive) together with its context (whitespace-insensitive JSON).
+    """
+    context = json.dumps(_normalize(term_context), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    payload = f"{_normalize(term or '').lower()}\x1f{context}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 class BusinessTerm(Base):
     __tablename__ = "business_glossary"
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
-    term = Column(String(150), nullable=False)
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)  # SQLite only autoincrements INTEGER keys
+    term = Column(String(150), nullable=False, index=True)
     term_context = Column(JSON, nullable=True)
+    term_key = Column(String(64), nullable=True)          # make_term_key(term, term_context)
     term_definition = Column(Text)
     department_owner = Column(String(100))
-    business_domain = Column(String(100))
+    business_domain = Column(String(100), index=True)
     synonyms = Column(String(1000))
     document_name = Column(String(200))
     source_system = Column(String(100))
     confidence_score = Column(Float, default=None)
     version = Column(Integer, default=1)
-    is_active = Column(Boolean, default=False)
+    is_active = Column(Boolean, default=False, index=True)
     approved_by = Column(String(100))
     created_at = Column(TIMESTAMP, server_default=func.now())
     last_updated = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ux_business_glossary_term_key", "term_key", unique=True),
+    )
+
     def __repr__(self):
         return f"<BusinessTerm(term='{self.term}', context='{self.term_context}', domain='{self.business_domain}')>"
+
+
+@event.listens_for(BusinessTerm, "before_insert")
+@event.listens_for(BusinessTerm, "before_update")
+def _set_term_key(mapper, connection, target):
+    target.term_key = make_term_key(target.term, target.term_context)
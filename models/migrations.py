@@ -0,0 +1,77 @@
+"""
+In-place schema migrations for existing databases.
+
+Base.metadata.create_all only creates missing tables; columns and indexes
+added to existing models are applied here. Every step checks the live
+schema first, so running the migrations again is a no-op.
+"""
+from sqlalchemy import inspect, select, update, bindparam, text
+
+from models.business_term import BusinessTerm, make_term_key
+
+
+def _add_missing_columns(conn, table, columns):
+    existing = {c["name"] for c in inspect(conn).get_columns(table.name)}
+    for name in columns:
+        if name not in existing:
+            column = table.c[name]
+            ddl_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {ddl_type} NULL"))
+            print(f"Added column {table.name}.{name}")
+
+
+def _create_missing_indexes(conn, table):
+    existing = {ix["name"] for ix in inspect(conn).get_indexes(table.name)}
+    for index in table.indexes:
+        if index.name not in existing:
+            index.create(bind=conn)
+            print(f"Created index {index.name}")
+
+
+def backfill_term_keys(conn, batch_size=5000):
+    """
+    Fill business_glossary.term_key for rows without one, newest first, in
+    batches of `batch_size`. When several rows share a (term, context), only
+    the most recent (highest id) gets the key, so the unique index can be
+    built without deleting data; the others keep NULL.
+    Returns (rows keyed, duplicate rows left unkeyed).
+    """
+    table = BusinessTerm.__table__
+    used = set(conn.execute(select(table.c.term_key).where(table.c.term_key.isnot(None))).scalars())
+    stmt = update(table).where(table.c.id == bindparam("row_id")).values(term_key=bindparam("key"))
+
+    keyed = duplicates = 0
+    last_id = None
+    while True:
+        # Keyset batches, newest first, so only batch_size rows are held
+        q = select(table.c.id, table.c.term, table.c.term_context).where(table.c.term_key.is_(None))
+        if last_id is not None:
+            q = q.where(table.c.id < last_id)
+        rows = conn.execute(q.order_by(table.c.id.desc()).limit(batch_size)).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        pending = []
+        for row_id, term, term_context in rows:
+            key = make_term_key(term, term_context)
+            if key in used:
+                duplicates += 1
+                continue
+            used.add(key)
+            pending.append({"row_id": row_id, "key": key})
+        if pending:
+            conn.execute(stmt, pending)
+            keyed += len(pending)
+    return keyed, duplicates
+
+
+def migrate_business_glossary(engine):
+    """Add term_key, backfill it, and create the glossary indexes."""
+    table = BusinessTerm.__table__
+    with engine.begin() as conn:
+        _add_missing_columns(conn, table, ["term_key"])
+        keyed, duplicates = backfill_term_keys(conn)
+        if keyed:
+            print(f"Backfilled term_key for {keyed} rows ({duplicates} duplicate rows left without a key)")
+        _create_missing_indexes(conn, table)
@@ -0,0 +1,129 @@
+"""
+Corpus-level TF-IDF with persisted document frequencies.
+
+StreamingTfidfScorer counts a document's 2-3 grams paragraph by paragraph,
+scores them against the document frequencies of every previously processed
+document, and then records the document in the DocumentFrequencyStore.
+Documents are identified by a hash of their content, so re-running the same
+document does not count it twice. A source (file path) whose content changed
+replaces its previous version in the statistics.
+"""
+import hashlib
+import os
+import sqlite3
+from collections import Counter
+
+from preprocessing.statistical_scoring import count_ngrams, score_ngram_counts
+from utils.constants import TFIDF_DF_STORE_PATH
+
+
+class DocumentFrequencyStore:
+    """Document frequencies of n-grams across processed documents (SQLite)."""
+
+    def __init__(self, path=TFIDF_DF_STORE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS ngram_df (ngram TEXT PRIMARY KEY, df INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS documents (doc_id TEXT PRIMARY KEY)")
+            if "source" not in {row[1] for row in conn.execute("PRAGMA table_info(documents)")}:
+                conn.execute("ALTER TABLE documents ADD COLUMN source TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_documents_source ON documents (source)")
+            conn.execute("CREATE TABLE IF NOT EXISTS document_ngrams (doc_id TEXT NOT NULL, ngram TEXT NOT NULL, "
+                         "PRIMARY KEY (doc_id, ngram))")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('n_docs', 0)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_doc_freqs(self, ngrams):
+        """Return ({ngram: df} for the known n-grams, number of documents)."""
+        ngrams = list(ngrams)
+        doc_freqs = {}
+        with self._connect() as conn:
+            n_docs = conn.execute("SELECT value FROM meta WHERE key = 'n_docs'").fetchone()[0]
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(ngrams), 500):
+                batch = ngrams[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(f"SELECT ngram, df FROM ngram_df WHERE ngram IN ({placeholders})", batch)
+                doc_freqs.update(rows.fetchall())
+        return doc_freqs, n_docs
+
+    def has_document(self, doc_id) -> bool:
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM documents WHERE doc_id = ?", (doc_id,)).fetchone() is not None
+
+    def add_document(self, ngrams, doc_id=None, source=None):
+        """
+        Count one more document containing each of `ngrams`.
+        A document already recorded under `doc_id` is not counted twice. When
+        `source` was last recorded with other content, that version is
+        subtracted first.
+        Returns True if the statistics were updated.
+        """
+        ngrams = list(ngrams)
+        with self._connect() as conn:
+            if doc_id is not None:
+                inserted = conn.execute("INSERT OR IGNORE INTO documents (doc_id, source) VALUES (?, ?)",
+                                        (doc_id, source))
+                if inserted.rowcount == 0:
+                    return False
+                if source is not None:
+                    previous = [row[0] for row in conn.execute(
+                        "SELECT doc_id FROM documents WHERE source = ? AND doc_id != ?", (source, doc_id))]
+                    for old_id in previous:
+                        self._remove_document(conn, old_id)
+                conn.executemany("INSERT OR IGNORE INTO document_ngrams (doc_id, ngram) VALUES (?, ?)",
+                                 ((doc_id, ngram) for ngram in ngrams))
+            conn.executemany(
+                "INSERT INTO ngram_df (ngram, df) VALUES (?, 1) "
+                "ON CONFLICT(ngram) DO UPDATE SET df = df + 1",
+                ((ngram,) for ngram in ngrams),
+            )
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'n_docs'")
+        return True
+
+    @staticmethod
+    def _remove_document(conn, doc_id):
+        conn.execute("UPDATE ngram_df SET df = df - 1 WHERE ngram IN "
+                     "(SELECT ngram FROM document_ngrams WHERE doc_id = ?)", (doc_id,))
+        conn.execute("DELETE FROM ngram_df WHERE df <= 0")
+        conn.execute("DELETE FROM document_ngrams WHERE doc_id = ?", (doc_id,))
+        conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+        conn.execute("UPDATE meta SET value = MAX(value - 1, 0) WHERE key = 'n_docs'")
+
+
+class StreamingTfidfScorer:
+    """Accumulate one document's n-gram counts paragraph by paragraph."""
+
+    def __init__(self, store: DocumentFrequencyStore = None):
+        self.store = store
+        self.ngram_counts = Counter()
+        self._digest = hashlib.sha256()
+
+    def add_paragraph(self, paragraph: str):
+        self.ngram_counts.update(count_ngrams(paragraph))
+        self._digest.update(paragraph.encode("utf-8") + b"\x00")
+
+    @property
+    def doc_id(self) -> str:
+        """Content hash of the paragraphs added so far."""
+        return self._digest.hexdigest()
+
+    def top_terms(self, top_n=100):
+        """Score the accumulated counts against the corpus statistics."""
+        if self.store is None:
+            return score_ngram_counts(self.ngram_counts, top_n)
+        doc_freqs, n_docs = self.store.get_doc_freqs(self.ngram_counts.keys())
+        return score_ngram_counts(self.ngram_counts, top_n, doc_freqs, n_docs,
+                                  includes_document=self.store.has_document(self.doc_id))
+
+    def commit(self, source=None):
+        """Record this document (under its content hash) in the corpus statistics."""
+        if self.store is not None and self.ngram_counts:
+            return self.store.add_document(self.ngram_counts.keys(), doc_id=self.doc_id, source=source)
+        return False
@@ -0,0 +1,79 @@
+import os
+
+from utils.model_registry import get_nlp
+from utils.constants import (
+    PREPROCESS_N_PROCESS,
+    PREPROCESS_BATCH_SIZE,
+    PREPROCESS_PARALLEL_MIN_PARAGRAPHS,
+)
+from preprocessing.tokenizer import lemmatize_doc
+from preprocessing.pos_tagger import extract_doc_noun_phrases
+
+# Components the paragraph analysis never reads (lemmas, POS and dependencies only)
+UNUSED_PIPES = ["ner"]
+
+
+def resolve_n_process(n_process, num_paragraphs=None):
+    """
+    Decide how many spaCy worker processes to use for a document.
+    None uses PREPROCESS_N_PROCESS, 0 or a negative value means one worker
+    per CPU core. Small documents (when the size is known) are always
+    parsed in-process.
+    """
+    if n_process is None:
+        n_process = PREPROCESS_N_PROCESS
+    if n_process <= 0:
+        n_process = os.cpu_count() or 1
+    if num_paragraphs is None:
+        return n_process
+    if num_paragraphs < PREPROCESS_PARALLEL_MIN_PARAGRAPHS:
+        return 1
+    return max(1, min(n_process, num_paragraphs))
+
+
+def parse_paragraphs(paragraphs, n_process=None, batch_size=None):
+    """
+    Parse every paragraph once with spaCy and derive both outputs from the same Doc.
+
+    Equivalent to calling tokenize_lemmatize_paragraph(paragraphs) followed by
+    extract_linguistic_candidates(paragraphs), but runs a single nlp.pipe pass
+    with unused pipeline components disabled. With n_process > 1 the parse is
+    spread over worker processes; nlp.pipe yields Docs in input order, so the
+    result is identical to the single-process run.
+
+    Returns:
+        (normalized_text, linguistic_candidates)
+    """
+    texts = [p for p in paragraphs if p.strip()]
+    n_process = resolve_n_process(n_process, len(texts))
+
+    normalized_text = []
+    meaningful_terms = set()
+    for _, record, phrases in iter_parsed_paragraphs(texts, n_process=n_process, batch_size=batch_size):
+        if record:
+            normalized_text.append(record)
+        meaningful_terms.update(phrases)
+
+    return normalized_text, list(meaningful_terms)
+
+
+def iter_parsed_paragraphs(paragraphs, n_process=None, batch_size=None):
+    """
+    Lazily parse an iterable of paragraphs with one nlp.pipe pass.
+
+    nlp.pipe pulls paragraphs batch by batch, so a generator input is never
+    materialized; memory depends on batch_size (times n_process), not on the
+    document size. Blank paragraphs are skipped.
+
+    Yields:
+        (paragraph, lemma record or None, list of noun phrases)
+    """
+    nlp = get_nlp()
+    batch_size = batch_size or PREPROCESS_BATCH_SIZE
+    n_process = resolve_n_process(n_process)
+
+    texts = (p for p in paragraphs if p.strip())
+    docs = nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=UNUSED_PIPES)
+    for doc in docs:
+        para = doc.text  # spaCy keeps the input text verbatim
+        yield para, lemmatize_doc(para, doc), list(extract_doc_noun_phrases(doc))
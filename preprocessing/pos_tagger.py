@@ -1,8 +1,4 @@
-import spacy
-from utils.constants import NLP_MODEL_LARGE
-
-# Load the English model with POS, NER, lemma, and dependency parsers
-nlp = spacy.load(NLP_MODEL_LARGE)
+from utils.model_registry import get_nlp
 
 def extract_candidate_terms(text):
     """
@@ -13,6 +9,7 @@ def extract_candidate_terms(text):
     Returns:
         list of terms
     """
+    nlp = get_nlp()
     doc = nlp(text)
     candidates = set()
 
@@ -27,16 +24,23 @@ def extract_linguistic_candidates(paragraphs):
     """
     Extract contextually rich noun phrases (adjective + noun, noun + noun, compound).
     """
+    nlp = get_nlp()
     meaningful_terms = set()
     for para in paragraphs:
         doc = nlp(para)
-        for token in doc:
-            if token.pos_ in ["NOUN", "PROPN"] and not token.is_stop:
-                # capture compounds like "loan application" or "customer data record"
-                phrase_parts = [child.text.lower() for child in token.lefts 
-                                if child.dep_ in ("amod", "compound") and not child.is_stop]
-                phrase = " ".join(phrase_parts + [token.text.lower()])
-                if len(phrase.split()) > 1 and len(phrase) > 3:
-                    meaningful_terms.add(phrase.strip())
+        meaningful_terms.update(extract_doc_noun_phrases(doc))
     
-    return list(meaningful_terms)
\ No newline at end of file
+    return list(meaningful_terms)
+
+def extract_doc_noun_phrases(doc):
+    """
+    Yield amod/compound noun phrases from an already parsed spaCy Doc.
+    """
+    for token in doc:
+        if token.pos_ in ["NOUN", "PROPN"] and not token.is_stop:
+            # capture compounds like "loan application" or "customer data record"
+            phrase_parts = [child.text.lower() for child in token.lefts 
+                            if child.dep_ in ("amod", "compound") and not child.is_stop]
+            phrase = " ".join(phrase_parts + [token.text.lower()])
+            if len(phrase.split()) > 1 and len(phrase) > 3:
+                yield phrase.strip()
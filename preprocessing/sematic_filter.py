@@ -2,11 +2,7 @@
 import numpy as np
 import re
 
-from sentence_transformers import SentenceTransformer
-from utils.constants import SENTENCE_MODEL
-
-# Load a compact transformer (fast & small)
-model = SentenceTransformer(SENTENCE_MODEL)
+from utils.embedding_cache import encode_texts
 
 def is_valid_term(term: str) -> bool:
     term = term.strip().lower()
@@ -51,11 +47,93 @@ def chunked_dot_similarity(a_emb, b_emb, chunk_size=256):
         sims.append(sims_chunk)
     return np.vstack(sims)
 
+def quantize_embeddings(emb, precision="float32"):
+    """
+    Store unit-normalized embeddings compactly.
+
+    precision: "float32", "float16", or "int8" (symmetric per-row scaling).
+    Returns (values, scales) where scales is None except for int8, in which
+    case row i is approximately values[i] * scales[i].
+    """
+    if precision == "float32":
+        return emb.astype(np.float32, copy=False), None
+    if precision == "float16":
+        return emb.astype(np.float16), None
+    if precision == "int8":
+        max_abs = np.abs(emb).max(axis=1)
+        max_abs[max_abs == 0] = 1.0
+        scales = (max_abs / 127.0).astype(np.float32)
+        values = np.rint(emb / scales[:, None]).astype(np.int8)
+        return values, scales
+    raise ValueError(f"Unsupported embedding precision: {precision}")
+
+def encode_normalized(texts, precision="float32", batch_size=64, block_size=8192):
+    """
+    Encode texts to unit vectors stored at `precision`, `block_size` texts at
+    a time, so only one block is ever held as float32.
+    Returns (values, scales) as quantize_embeddings does.
+    """
+    values_blocks, scale_blocks = [], []
+    for start in range(0, len(texts), block_size):
+        emb = encode_texts(texts[start:start + block_size], batch_size=batch_size)
+        norms = np.linalg.norm(emb, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        values, scales = quantize_embeddings(emb / norms, precision)
+        values_blocks.append(values)
+        if scales is not None:
+            scale_blocks.append(scales)
+    values = np.concatenate(values_blocks) if len(values_blocks) > 1 else values_blocks[0]
+    scales = np.concatenate(scale_blocks) if scale_blocks else None
+    return values, scales
+
+def _as_float32(values, scales, start, end):
+    block = values[start:end].astype(np.float32)
+    if scales is not None:
+        block *= scales[start:end, None]
+    return block
+
+def chunked_best_match(a_emb, b_emb, a_scales=None, b_scales=None, chunk_size=256, b_chunk_size=4096):
+    """
+    For every row of a_emb (N x D) find its most similar row of b_emb (M x D)
+    without materializing the N x M similarity matrix.
+
+    Both sides are processed in tiles; only a chunk_size x b_chunk_size block
+    of scores exists at a time and is reduced straight away to a running
+    (best index, best score) per row. Inputs may be float32, float16 or int8
+    (with per-row scales from quantize_embeddings); tiles are widened to
+    float32 just before the product. Ties resolve to the lowest index, like
+    np.argmax over a full row.
+
+    Returns:
+        (best_idx: int64 array of shape (N,), best_score: float32 array of shape (N,))
+    """
+    N, M = a_emb.shape[0], b_emb.shape[0]
+    best_idx = np.zeros(N, dtype=np.int64)
+    best_score = np.full(N, -np.inf, dtype=np.float32)
+
+    for b_start in range(0, M, b_chunk_size):
+        b_end = min(b_start + b_chunk_size, M)
+        b_block = _as_float32(b_emb, b_scales, b_start, b_end)
+        for a_start in range(0, N, chunk_size):
+            a_end = min(a_start + chunk_size, N)
+            # (c, D) @ (D, cb) -> (c, cb), reduced immediately
+            sims = _as_float32(a_emb, a_scales, a_start, a_end) @ b_block.T
+            tile_idx = sims.argmax(axis=1)
+            tile_best = sims[np.arange(a_end - a_start), tile_idx]
+            better = tile_best > best_score[a_start:a_end]
+            best_score[a_start:a_end][better] = tile_best[better]
+            best_idx[a_start:a_end][better] = tile_idx[better] + b_start
+
+    return best_idx, best_score
+
 def merge_by_semantics(linguistic_terms_dict, tfidf_scores, threshold=0.75,
-                                 max_tfidf_terms=100, batch_size=64, chunk_size=256, use_prefilter=True):
+                                 max_tfidf_terms=100, batch_size=64, chunk_size=256, use_prefilter=True,
+                                 precision="float32"):
     """
     linguistic_terms_dict: dict(paragraph_index -> [terms])
     tfidf_scores: dict(term -> score)
+    precision: storage for the embeddings while matching ("float32",
+        "float16" or "int8"); lower precision cuts memory 2-4x.
     """
     # Flatten linguistic list and dedupe
     ling_terms_flat = []
@@ -75,30 +153,20 @@ def merge_by_semantics(linguistic_terms_dict, tfidf_scores, threshold=0.75,
 
     if not ling_terms_filtered:
         return tfidf_terms  # nothing to compare, return tfidf
+    if not tfidf_terms:
+        return ling_terms_filtered  # nothing to merge into
+
+    # Encode in batches (through the embedding cache) as unit vectors, cosine == dot
+    tfidf_emb, tfidf_scales = encode_normalized(tfidf_terms, precision, batch_size=batch_size)
+    ling_emb, ling_scales = encode_normalized(ling_terms_filtered, precision, batch_size=batch_size)
+
+    # Best TF-IDF match per linguistic term, streamed chunk by chunk
+    best_idx, best_scores = chunked_best_match(ling_emb, tfidf_emb, ling_scales, tfidf_scales,
+                                               chunk_size=chunk_size)
 
-    # Encode in batches and normalize
-    # model.encode returns numpy arrays; use convert_to_tensor=False for numpy
-    # encode tfidf terms once
-    tfidf_emb = model.encode(tfidf_terms, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
-    ling_emb = model.encode(ling_terms_filtered, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
-
-    # Normalize to unit vectors for cosine == dot
-    tfidf_emb = tfidf_emb / np.linalg.norm(tfidf_emb, axis=1, keepdims=True)
-    ling_emb = ling_emb / np.linalg.norm(ling_emb, axis=1, keepdims=True)
-
-    # Compute similarities in chunks
-    sim_matrix = chunked_dot_similarity(ling_emb, tfidf_emb, chunk_size=chunk_size)  # shape (L, T)
-
-    merged_terms = set()
-    L = sim_matrix.shape[0]
-    for i in range(L):
-        row = sim_matrix[i]
-        best_j = int(np.argmax(row))
-        best_score = float(row[best_j])
-        if best_score >= threshold:
-            merged_terms.add(tfidf_terms[best_j])
-        else:
-            merged_terms.add(ling_terms_filtered[i])
+    merged = best_scores >= threshold
+    merged_terms = {tfidf_terms[j] for j in best_idx[merged]}
+    merged_terms.update(t for t, m in zip(ling_terms_filtered, merged) if not m)
 
     # Ensure top TF-IDF terms are present
     for t in tfidf_terms[:min(10, len(tfidf_terms))]:
@@ -1,65 +1,177 @@
+import math
 import re
-from sklearn.feature_extraction.text import TfidfVectorizer
+from collections import Counter
 from sklearn.feature_extraction import text
 
+TOKEN_RE = re.compile(r'\b[a-zA-Z][a-zA-Z\-]+\b')
+
+# Combine default English stopwords + some domain stopwords
+custom_stopwords = text.ENGLISH_STOP_WORDS.union({
+    "shall", "will", "also", "may", "must", "within", "however", "thereof", "therein", "able",
+    "sent", "manage", "implement",
+    "system", "user", "data", "process", "application", "workflow",
+    "information", "function", "record", "document"
+})
+
 def remove_redundant_phrases(scored_phrases):
     """
     Remove n-grams that are substrings of longer, higher-ranked phrases.
     """
-    filtered = []
     phrases = list(scored_phrases.keys())
+    redundant = find_contained_phrases(phrases)
+    return {p: scored_phrases[p] for p in phrases if p not in redundant}
+
+def find_contained_phrases(phrases):
+    """
+    Return the phrases that occur as a substring of another phrase.
+
+    Instead of testing every pair, phrases are indexed by tokens. A phrase
+    Q = q1 .. qk (single-space separated) occurs inside P = p1 .. pm exactly
+    when, for some window pa .. pb of P, pa ends with q1, the inner tokens are
+    equal and pb starts with qk; a one-token Q must be a substring of one
+    token of P. Each P is therefore checked by looking up suffixes/prefixes of
+    its own tokens, which is linear in the vocabulary. Phrases that are not
+    in canonical single-space form are compared pairwise.
+    """
+    phrases = list(dict.fromkeys(phrases))
+    regular = []
+    irregular = []
+    for phrase in phrases:
+        if phrase and " ".join(phrase.split()) == phrase:
+            regular.append(phrase)
+        else:
+            irregular.append(phrase)
+
+    # Index multi-token phrases by (first token, inner tokens) -> last tokens
+    singles = set()
+    lasts_by_head = {}
+    first_tokens = set()
+    max_tokens = 1
+    for phrase in regular:
+        tokens = phrase.split(" ")
+        if len(tokens) == 1:
+            singles.add(phrase)
+            continue
+        head = (tokens[0], tuple(tokens[1:-1]))
+        lasts_by_head.setdefault(head, set()).add(tokens[-1])
+        first_tokens.add(tokens[0])
+        max_tokens = max(max_tokens, len(tokens))
+    max_single = max((len(s) for s in singles), default=0)
+
+    redundant = set()
+    for phrase in regular:
+        tokens = phrase.split(" ")
+        m = len(tokens)
+
+        if singles:
+            for token in tokens:
+                for start in range(len(token)):
+                    for end in range(start + 1, min(len(token), start + max_single) + 1):
+                        sub = token[start:end]
+                        if sub in singles and sub != phrase:
+                            redundant.add(sub)
+
+        for a in range(m - 1):
+            token_a = tokens[a]
+            for cut in range(len(token_a)):
+                first = token_a[cut:]
+                if first not in first_tokens:
+                    continue
+                for b in range(a + 1, min(m, a + max_tokens)):
+                    lasts = lasts_by_head.get((first, tuple(tokens[a + 1:b])))
+                    if not lasts:
+                        continue
+                    token_b = tokens[b]
+                    for end in range(1, len(token_b) + 1):
+                        last = token_b[:end]
+                        if last in lasts:
+                            contained = " ".join([first, *tokens[a + 1:b], last])
+                            if contained != phrase:
+                                redundant.add(contained)
+
+    # Non-canonical phrases (extra whitespace, empty): plain pairwise check
+    for phrase in irregular:
+        if any(phrase in other and phrase != other for other in phrases):
+            redundant.add(phrase)
+        for other in regular:
+            if other in phrase and other != phrase:
+                redundant.add(other)
+
+    return redundant
+
+def tfidf_tokens(doc):
+    """Lowercase word tokens kept for TF-IDF (no digits, short tokens or stopwords)."""
+    # Simple word tokenizer
+    tokens = TOKEN_RE.findall(doc.lower())
+    # Keep only alphabetic words (ignore numbers, short, or weird tokens)
+    return [t for t in tokens if len(t) > 2 and t not in custom_stopwords]
+
+def custom_analyzer(doc):
+    """
+    Tokenize text for TF-IDF and return its 2-3 grams.
+    Filters out numbers, tokens containing digits, short tokens and stopwords.
+    """
+    tokens = tfidf_tokens(doc)
 
-    for i, phrase in enumerate(phrases):
-        if not any(
-            phrase in other and phrase != other
-            for j, other in enumerate(phrases)
-            if j != i
-        ):
-            filtered.append(phrase)
-    return {p: scored_phrases[p] for p in filtered}
+     # Build 2–3 grams manually
+    ngrams = []
+    for n in range(2, 4):
+        ngrams.extend([" ".join(tokens[i:i+n]) for i in range(len(tokens)-n+1)])
+    return ngrams
 
-def extract_top_tfidf_terms(whole_text, top_n=100):
+def count_ngrams(paragraph):
+    """
+    Count the TF-IDF 2-3 grams of one paragraph in a single pass over its
+    tokens (same n-grams as custom_analyzer).
+    """
+    tokens = tfidf_tokens(paragraph)
+    counts = Counter(map(" ".join, zip(tokens, tokens[1:])))
+    counts.update(map(" ".join, zip(tokens, tokens[1:], tokens[2:])))
+    return counts
+
+def score_ngram_counts(ngram_counts, top_n=100, doc_freqs=None, n_docs=0, includes_document=False):
+    """
+    Score the n-gram counts of one document with TF-IDF.
+
+    doc_freqs / n_docs are corpus statistics (see preprocessing.corpus_tfidf).
+    Unless they already include this document (includes_document), it counts
+    as one more document containing each of its n-grams. IDF is smoothed
+    like scikit-learn's: idf = ln((1 + N) / (1 + df)) + 1. Without corpus
+    statistics every IDF is 1, which matches fitting TfidfVectorizer on the
+    single document. Scores are L2-normalized.
+    """
+    if not ngram_counts:
+        return {}
+
+    doc_freqs = doc_freqs or {}
+    own = 0 if includes_document else 1
+    total_docs = n_docs + own
+    weights = {
+        term: count * (math.log((1 + total_docs) / (1 + doc_freqs.get(term, 0) + own)) + 1)
+        for term, count in ngram_counts.items()
+    }
+    norm = math.sqrt(sum(w * w for w in weights.values()))
+    # Alphabetical order first, so ties rank like the vectorizer's feature order
+    scores = {term: weights[term] / norm for term in sorted(weights)}
+    scores = remove_redundant_phrases(scores)
+
+    # Sort and return top N
+    return dict(sorted(scores.items(), key=lambda x: x[1], reverse=True)[:top_n])
+
+def extract_top_tfidf_terms(whole_text, top_n=100, df_store=None):
     """
     Compute TF-IDF to identify most important terms per document.
     Filters out numbers and tokens containing digits.
+    With a DocumentFrequencyStore, IDF comes from the persisted corpus
+    statistics; otherwise the document is scored on its own.
     """
     # Filter empty or invalid text early
     if not whole_text or not whole_text.strip():
         return {}
-    
-    # Combine default English stopwords + some domain stopwords
-    custom_stopwords = text.ENGLISH_STOP_WORDS.union({
-        "shall", "will", "also", "may", "must", "within", "however", "thereof", "therein", "able",
-        "sent", "manage", "implement",
-        "system", "user", "data", "process", "application", "workflow",
-        "information", "function", "record", "document"
-    })
-
-    # Define custom analyzer to filter numeric tokens
-    def custom_analyzer(doc):
-        # Simple word tokenizer
-        tokens = re.findall(r'\b[a-zA-Z][a-zA-Z\-]+\b', doc.lower())
-        # Keep only alphabetic words (ignore numbers, short, or weird tokens)
-        tokens = [t for t in tokens if len(t) > 2 and t not in custom_stopwords]
-        
-         # Build 2–3 grams manually
-        ngrams = []
-        for n in range(2, 4):
-            ngrams.extend([" ".join(tokens[i:i+n]) for i in range(len(tokens)-n+1)])
-        return ngrams
-
-
-    # Vectorizer using custom analyzer
-    vectorizer = TfidfVectorizer(
-        stop_words="english",
-        analyzer=custom_analyzer
-    )
-
-    # Compute TF-IDF
-    tfidf_matrix = vectorizer.fit_transform([whole_text])
-    scores = dict(zip(vectorizer.get_feature_names_out(), tfidf_matrix.sum(axis=0).A1))
-    scores = remove_redundant_phrases(scores)
 
-    # Sort and return top N
-    top_scores = dict(sorted(scores.items(), key=lambda x: x[1], reverse=True)[:top_n])
-    return top_scores
+    ngram_counts = count_ngrams(whole_text)
+    if df_store is None:
+        return score_ngram_counts(ngram_counts, top_n)
+
+    doc_freqs, n_docs = df_store.get_doc_freqs(ngram_counts.keys())
+    return score_ngram_counts(ngram_counts, top_n, doc_freqs, n_docs)
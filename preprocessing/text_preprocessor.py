@@ -1,13 +1,13 @@
-from typing import Dict
+from typing import Dict, Iterable
 import re, json
 
-from preprocessing.pos_tagger import extract_linguistic_candidates
+from preprocessing.document_parser import parse_paragraphs, iter_parsed_paragraphs
 from preprocessing.statistical_scoring import extract_top_tfidf_terms
-from preprocessing.tokenizer import tokenize_lemmatize_paragraph
+from preprocessing.corpus_tfidf import DocumentFrequencyStore, StreamingTfidfScorer
 from preprocessing.sematic_filter import merge_by_semantics
 
 
-def preprocess_text(text: str) -> Dict:
+def preprocess_text(text: str, n_process: int = None) -> Dict:
     """
     Perform full NLP preprocessing pipeline:
     - Sentence segmentation
@@ -15,12 +15,14 @@ def preprocess_text(text: str) -> Dict:
     - Lemmatization
     - POS tagging
     - Phrase (noun chunk) detection
+    n_process > 1 parses paragraphs in worker processes (None uses
+    PREPROCESS_N_PROCESS); the result does not depend on it.
     Returns structured results.
     """
     
     paragraphs = split_into_paragraphs(text)
-    normalized_text = tokenize_lemmatize_paragraph(paragraphs)
-    linguistic_candidates = extract_linguistic_candidates(paragraphs)
+    # One spaCy pass yields both the lemma records and the noun phrases
+    normalized_text, linguistic_candidates = parse_paragraphs(paragraphs, n_process=n_process)
 
     # How many terms to process
     top_statistical_terms = extract_top_tfidf_terms(text, 100)
@@ -32,6 +34,44 @@ def preprocess_text(text: str) -> Dict:
         "normalized_text": normalized_text
     }
 
+def preprocess_paragraph_stream(paragraphs: Iterable, n_process: int = None, batch_size: int = None,
+                                df_store: DocumentFrequencyStore = None, source: str = None) -> Dict:
+    """
+    Streaming variant of preprocess_text.
+
+    Consumes an iterable of paragraphs (strings, or dicts with a "text" key as
+    yielded by ingestion.document_reader.iter_prepared_paragraphs) in
+    nlp.pipe batches; only the per-paragraph results and the n-gram counts
+    are kept, never the whole document text. N-grams are counted per
+    paragraph, so they do not span paragraph boundaries.
+
+    With a DocumentFrequencyStore, TF-IDF uses the corpus document
+    frequencies and the document (identified by its content hash; `source`
+    is its path, so an edited file replaces its previous version) is added
+    to them afterwards.
+    """
+    texts = (p["text"] if isinstance(p, dict) else p for p in paragraphs)
+
+    normalized_text = []
+    linguistic_candidates = set()
+    tfidf = StreamingTfidfScorer(df_store)
+    for para, record, phrases in iter_parsed_paragraphs(texts, n_process=n_process, batch_size=batch_size):
+        if record:
+            normalized_text.append(record)
+        linguistic_candidates.update(phrases)
+        tfidf.add_paragraph(para)
+
+    # How many terms to process
+    top_statistical_terms = tfidf.top_terms(100)
+    tfidf.commit(source)
+
+    final_candidates = merge_by_semantics(list(linguistic_candidates), top_statistical_terms)
+
+    return {
+        "final_candidates": final_candidates,
+        "normalized_text": normalized_text
+    }
+
 def split_into_paragraphs(text: str):
     """
     Splits a string into a list of paragraphs, handling various
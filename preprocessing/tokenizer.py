@@ -1,14 +1,11 @@
-import spacy
-from utils.constants import NLP_MODEL_LARGE
-
-# Load spaCy
-nlp = spacy.load(NLP_MODEL_LARGE)
+from utils.model_registry import get_nlp
 
 def tokenize_lemmatize_text(text):
     """
     Split text into sentences, then tokenize and lemmatize each sentence.
     Returns a list of dicts with original and processed sentence.
     """
+    nlp = get_nlp()
     doc = nlp(text)
     results = []
 
@@ -27,25 +24,49 @@ def tokenize_lemmatize_text(text):
     return results
 
 def tokenize_lemmatize_paragraph(paragraphs):
+    nlp = get_nlp()
     all_candidates = []
     for p in paragraphs:
         if not p.strip():
             continue
 
         doc = nlp(p)
-        lemmas = [
-            token.lemma_.lower()
-            for token in doc
-            if token.pos_ in ["NOUN", "PROPN", "ADJ", "VERB"]
-            and not token.is_stop
-            and token.is_alpha
-        ]
+        record = lemmatize_doc(p, doc)
+        if record:  # only add if there’s something meaningful
+            all_candidates.append(record)
+
+    return all_candidates
 
-        if lemmas:  # only add if there’s something meaningful
-            all_candidates.append({
-                "original_sentence": p.strip(),
-                "lemmatized_sentence": " ".join(lemmas),
-                "tokens": lemmas
-            })
+def lemmatize_doc(paragraph, doc):
+    """
+    Build the lemma record for a paragraph from its already parsed spaCy Doc.
+    Returns None when the paragraph has no meaningful lemmas.
+    """
+    lemmas = [
+        token.lemma_.lower()
+        for token in doc
+        if token.pos_ in ["NOUN", "PROPN", "ADJ", "VERB"]
+        and not token.is_stop
+        and token.is_alpha
+    ]
+    if not lemmas:
+        return None
+
+    return {
+        "original_sentence": paragraph.strip(),
+        "lemmatized_sentence": " ".join(lemmas),
+        "tokens": lemmas
+    }
 
-    return all_candidates
\ No newline at end of file
+def lemmatize_terms(terms, batch_size=256):
+    """
+    Lemmatize short terms the same way paragraphs are lemmatized (lowercase,
+    alphabetic, no stop words), without a POS filter since terms are only a
+    few words long. Parser and NER are not needed for lemmas.
+    Returns one token list per term.
+    """
+    nlp = get_nlp()
+    return [
+        [token.lemma_.lower() for token in doc if not token.is_stop and token.is_alpha]
+        for doc in nlp.pipe(terms, batch_size=batch_size, disable=["parser", "ner"])
+    ]
@@ -1,15 +1,30 @@
-
-from models.db import SessionLocal
+from sqlalchemy import func, select
+from models.db import ScopedSession
 from models.business_domain import BusinessDomain
 
 class BusinessDomainRepository:
-    def __init__(self):
-        self.session = SessionLocal()
+    def __init__(self, session=None):
+        # Defaults to the calling thread's scoped session
+        self.session = session if session is not None else ScopedSession
 
     def get_all(self):
         query = self.session.query(BusinessDomain)
         return query.all()
 
+    def get_fingerprint(self):
+        """
+        Cheap change marker for the table: (row count, max id, last update).
+        Read-only, on a connection of its own: it sees the latest commits and
+        leaves the session's transaction (and any pending work) untouched.
+        """
+        query = select(
+            func.count(BusinessDomain.id),
+            func.max(BusinessDomain.id),
+            func.max(BusinessDomain.updated_at),
+        )
+        with self.session.get_bind().connect() as conn:
+            return tuple(conn.execute(query).one())
+
     def get_by_id(self, domain_id: int):
         return self.session.query(BusinessDomain).filter(BusinessDomain.id == domain_id).first()
 
@@ -49,3 +64,9 @@ class BusinessDomainRepository:
             self.session.commit()
             return True
         return False
+
+    def close(self):
+        if self.session is ScopedSession:
+            ScopedSession.remove()
+        else:
+            self.session.close()
@@ -0,0 +1,255 @@
+"""
+Persisted embedding matrix of the reference glossary terms.
+
+The index lives next to the embedding cache as an append-only float32 matrix
+of unit-normalized vectors (read through np.memmap) plus a term list. It is
+extended by BusinessTermRepository whenever terms are written, so
+deduplicating candidates only costs encoding the candidates and a search
+against the stored vectors. Search goes through utils.vector_index: exact by
+default, or an IVF index (persisted next to the vectors) when
+VECTOR_INDEX_BACKEND is "ivf". Appends hold a file lock, so several
+processes can share the index files.
+"""
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from utils.constants import SENTENCE_MODEL, REFERENCE_INDEX_DIR
+from utils.embedding_cache import encode_texts, normalize_text
+from utils.vector_index import (
+    build_vector_index, select_backend, measure_recall, ExactVectorIndex, IVFVectorIndex,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are still serialized within the process
+    fcntl = None
+
+
+def _normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class ReferenceTermIndex:
+    def __init__(self, model_name=SENTENCE_MODEL, index_dir=REFERENCE_INDEX_DIR):
+        self.model_name = model_name
+        self.dir = os.path.join(index_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+        self.vectors_path = os.path.join(self.dir, "vectors.f32")
+        self.terms_path = os.path.join(self.dir, "terms.jsonl")
+        self.meta_path = os.path.join(self.dir, "meta.json")
+        self.ivf_path = os.path.join(self.dir, "ivf.npz")
+        self.lock_path = os.path.join(self.dir, "index.lock")
+
+        self._lock = threading.RLock()
+        self.terms = []
+        self._keys = {}
+        self._dim = None
+        self._vectors = None
+        self._search_index = None
+        if os.path.exists(self.meta_path):
+            with self._file_lock():
+                self._load()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared with other processes using the same index files."""
+        os.makedirs(self.dir, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self):
+        """
+        (Re)read the persisted index. Call with the file lock held: what an
+        interrupted append left behind (vector rows without a term, terms
+        without a complete vector row) is truncated, so the next append
+        starts aligned.
+        """
+        previous_rows = len(self.terms)
+        self.terms = []
+        self._keys = {}
+        self._dim = None
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                self._dim = json.load(f)["dim"]
+
+        if self._dim is not None:
+            row_bytes = self._dim * 4
+            total_rows = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+            terms_bytes = 0
+            if os.path.exists(self.terms_path):
+                with open(self.terms_path, "rb") as f:
+                    for line in f:
+                        if len(self.terms) >= total_rows or not line.endswith(b"\n"):
+                            break
+                        term = json.loads(line)
+                        self._keys[normalize_text(term).lower()] = len(self.terms)
+                        self.terms.append(term)
+                        terms_bytes += len(line)
+                if os.path.getsize(self.terms_path) > terms_bytes:
+                    os.truncate(self.terms_path, terms_bytes)
+            if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) > len(self.terms) * row_bytes:
+                os.truncate(self.vectors_path, len(self.terms) * row_bytes)
+
+        if len(self.terms) != previous_rows:
+            self._vectors = None
+            self._search_index = None
+
+    @property
+    def vectors(self):
+        """Memory-mapped (N x dim) matrix of unit-normalized reference embeddings."""
+        with self._lock:
+            if self._vectors is None and self.terms:
+                self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                          shape=(len(self.terms), self._dim))
+            return self._vectors
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __contains__(self, term):
+        return normalize_text(term).lower() in self._keys
+
+    def _unindexed(self, terms):
+        new_terms = []
+        seen = set()
+        for term in terms:
+            key = normalize_text(term or "").lower()
+            if key and key not in self._keys and key not in seen:
+                seen.add(key)
+                new_terms.append(term)
+        return new_terms
+
+    def add_terms(self, terms):
+        """Encode and append the terms not yet in the index. Returns the number added."""
+        with self._lock:
+            candidates = self._unindexed(terms)
+            if not candidates:
+                return 0
+            vectors = _normalize_rows(encode_texts(candidates, model_name=self.model_name))
+
+            with self._file_lock():
+                # Pick up rows other processes appended since the last read
+                self._load()
+                new_terms = self._unindexed(candidates)
+                if not new_terms:
+                    return 0
+                if len(new_terms) < len(candidates):
+                    keep = set(new_terms)
+                    vectors = vectors[[i for i, t in enumerate(candidates) if t in keep]]
+
+                if self._dim is None:
+                    self._dim = int(vectors.shape[1])
+                    with open(self.meta_path, "w") as f:
+                        json.dump({"model": self.model_name, "dim": self._dim}, f)
+
+                # Vectors first: on load, terms without a complete vector row are dropped
+                with open(self.vectors_path, "ab") as f:
+                    f.write(vectors.tobytes())
+                with open(self.terms_path, "a") as f:
+                    f.write("".join(json.dumps(t, ensure_ascii=False) + "\n" for t in new_terms))
+
+            for term in new_terms:
+                self._keys[normalize_text(term).lower()] = len(self.terms)
+                self.terms.append(term)
+            self._vectors = None  # remap with the new row count on next access
+            self._search_index = None
+            return len(new_terms)
+
+    def rebuild(self, terms):
+        """Drop the persisted index and rebuild it from `terms`."""
+        with self._lock:
+            with self._file_lock():
+                for path in (self.vectors_path, self.terms_path, self.meta_path, self.ivf_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+                self._load()
+            self.add_terms(terms)
+
+    def sync(self, reference_terms):
+        """
+        Bring the index in line with the reference terms stored in the database.
+        Terms added outside the repository are appended; if terms were removed
+        the index is rebuilt (encodings come from the embedding cache).
+        """
+        wanted = {normalize_text(t).lower() for t in reference_terms if t}
+        with self._lock:
+            if set(self._keys) - wanted:
+                print("Reference index contains removed terms, rebuilding...")
+                self.rebuild(reference_terms)
+            else:
+                self.add_terms(reference_terms)
+
+    @property
+    def search_index(self):
+        """The configured vector index over the stored vectors, built on first use."""
+        with self._lock:
+            if self._search_index is None:
+                self._search_index = self._open_search_index()
+            return self._search_index
+
+    def _open_search_index(self):
+        vectors = self.vectors
+        if vectors is None or select_backend(len(vectors)) != "ivf":
+            return build_vector_index(vectors)
+
+        # Reuse persisted centroids; rows appended since are assigned on load.
+        # Train only without saved state, or once the index has grown 4x past
+        # the rows it was trained on.
+        if os.path.exists(self.ivf_path):
+            state = np.load(self.ivf_path)
+            if len(self.terms) <= 4 * int(state["trained_rows"]):
+                ivf = IVFVectorIndex(vectors, centroids=state["centroids"], assignments=state["assignments"])
+                if len(ivf.assignments) > len(state["assignments"]):
+                    self._save_ivf(ivf, int(state["trained_rows"]))
+                return ivf
+        index = build_vector_index(vectors)
+        self._save_ivf(index, len(self.terms))
+        return index
+
+    def _save_ivf(self, ivf, trained_rows):
+        np.savez(self.ivf_path, centroids=ivf.centroids, assignments=ivf.assignments,
+                 trained_rows=np.int64(trained_rows))
+
+    def best_matches(self, query_vectors):
+        """For each query vector return (best reference index, cosine score)."""
+        query_vectors = _normalize_rows(np.asarray(query_vectors, dtype=np.float32))
+        return self.search_index.search(query_vectors)
+
+    def recall(self, query_vectors, sample_size=200, seed=0):
+        """
+        Recall@1 of the configured search index against exact search, on a
+        sample of `query_vectors`. Always 1.0 for the exact backend.
+        """
+        index = self.search_index
+        if isinstance(index, ExactVectorIndex):
+            return 1.0
+        query_vectors = _normalize_rows(np.asarray(query_vectors, dtype=np.float32))
+        if len(query_vectors) > sample_size:
+            rng = np.random.default_rng(seed)
+            query_vectors = query_vectors[rng.choice(len(query_vectors), sample_size, replace=False)]
+        return measure_recall(index, query_vectors)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_reference_index() -> ReferenceTermIndex:
+    """Return the process-wide reference term index, opening it on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ReferenceTermIndex()
+        return _index
@@ -1,80 +1,171 @@
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, func
 from sqlalchemy.exc import SQLAlchemyError
-from models.db import SessionLocal
-from models.business_term import BusinessTerm
+from models.db import ScopedSession
+from models.business_term import BusinessTerm, make_term_key
 
 class BusinessTermRepository:
-    def __init__(self):
-        self.session = SessionLocal()
+    def __init__(self, session=None):
+        """
+        Without `session`, calls go to the calling thread's scoped session, so
+        a module-level repository is safe to share between threads.
+        """
+        self.session = session if session is not None else ScopedSession
 
     def term_exists(self, term: str) -> bool:
         """Check if term already exists in DB."""
         q = select(BusinessTerm).where(BusinessTerm.term == term)
         return self.session.execute(q).scalar_one_or_none() is not None
 
-    def save_new_terms(self, enriched_terms: list):
-        """Save only new terms to DB."""
-        saved_count = 0
-        for t in enriched_terms:
-            if not t.get("term_definition") or self.term_exists(t["term"]):
-                continue  # skip existing or invalid entries
-
-            try:
-                new_term = BusinessTerm(
-                    term=t["term"],
-                    term_context=t.get("term_context"),
-                    term_definition=t.get("term_definition"),
-                    business_domain=t.get("business_domain"),
-                    synonyms=", ".join(t.get("synonyms", [])),
-                    confidence_score=t.get("confidence_score", None),
-                    department_owner=t.get("department_owner"),
-                    document_name=t.get("document_name"),
-                    source_system=t.get("source_system"),
-                    is_active=False
-                )
-                self.session.add(new_term)
-                saved_count += 1
-            except SQLAlchemyError as e:
-                print(f"Error adding term '{t['term']}': {e}")
-                self.session.rollback()
+    def get_existing_terms(self, terms, chunk_size=1000):
+        """
+        Return the lowercased names among `terms` that are already stored,
+        with one IN query per `chunk_size` names. Names compare
+        case-insensitively on every backend (LOWER on both sides).
+        """
+        names = list({t.lower() for t in terms if t})
+        existing = set()
+        for i in range(0, len(names), chunk_size):
+            q = select(BusinessTerm.term).where(func.lower(BusinessTerm.term).in_(names[i:i + chunk_size]))
+            existing.update(name.lower() for name in self.session.execute(q).scalars())
+        return existing
 
-        try:
-            self.session.commit()
-            print(f"Saved {saved_count} new terms.")
-        except SQLAlchemyError as e:
-            print(f"Commit error: {e}")
-            self.session.rollback()
+    def save_new_terms(self, enriched_terms: list, chunk_size=1000):
+        """
+        Save only new terms to DB: the insert-only branch of upsert_terms.
+
+        Entries are identified like upserts, by the term_key hash of
+        (term, term_context), which ignores case and whitespace. Entries
+        already stored, or repeated in the input, are skipped.
+
+        Returns:
+            {"inserted": int, "skipped": int (already stored or repeated), "invalid": int (no definition)}
+        """
+        valid = [t for t in enriched_terms if t.get("term_definition") and t.get("term")]
+        invalid = len(enriched_terms) - len(valid)
+        rows = [
+            {
+                "term": t["term"],
+                "term_context": t.get("term_context"),
+                "term_definition": t.get("term_definition"),
+                "business_domain": t.get("business_domain"),
+                "synonyms": ", ".join(t.get("synonyms") or []),
+                "confidence_score": t.get("confidence_score", None),
+                "department_owner": t.get("department_owner"),
+                "document_name": t.get("document_name"),
+                "source_system": t.get("source_system"),
+                "is_active": False,
+            }
+            for t in valid
+        ]
+
+        written = self._write_terms(rows, chunk_size, update_existing=False)
+        if written is None:
+            return {"inserted": 0, "skipped": 0, "invalid": invalid}
+        counts = {"inserted": written["inserted"], "skipped": len(rows) - written["inserted"], "invalid": invalid}
+        print(f"Saved {counts['inserted']} new terms ({counts['skipped']} existing, {invalid} without definition).")
+        return counts
 
     def upsert_term(self, term_data: dict):
         """
         Insert or update a business term based on (term, term_context).
         """
+        result = self.upsert_terms([term_data])
+        if result["updated"]:
+            print(f"Updated existing term: {term_data['term']}")
+        elif result["inserted"]:
+            print(f"Inserted new term: {term_data['term']}")
+
+    def upsert_terms(self, terms_data: list, chunk_size=1000):
+        """
+        Insert or update many business terms, matched on (term, term_context)
+        through the indexed term_key hash.
+
+        Per chunk of `chunk_size` entries this is one keyed lookup, one
+        multi-row INSERT for new entries and bulk UPDATEs by primary key for
+        existing ones; everything commits as one transaction. Existing rows
+        get the non-None fields and their version bumped once per upsert, so
+        repeated entries in the input behave like successive upsert_term calls.
+
+        Returns:
+            {"inserted": int, "updated": int}
+        """
+        return self._write_terms(terms_data, chunk_size, update_existing=True) or {"inserted": 0, "updated": 0}
+
+    def _write_terms(self, terms_data, chunk_size, update_existing):
+        """
+        Shared body of upsert_terms and save_new_terms. Without
+        `update_existing`, stored entries are left untouched and repeated
+        entries keep their first occurrence.
+        Returns {"inserted": int, "updated": int}, or None on a database error.
+        """
+        columns = set(BusinessTerm.__table__.columns.keys()) - {"id", "term_key", "version"}
+        merged = {}  # term_key -> [fields, number of upserts]
+        for term_data in terms_data:
+            key = make_term_key(term_data["term"], term_data.get("term_context"))
+            fields = {k: v for k, v in term_data.items() if k in columns}
+            if key not in merged:
+                merged[key] = [fields, 1]
+            elif update_existing:
+                merged[key][0].update((k, v) for k, v in fields.items() if v is not None)
+                merged[key][1] += 1
+
+        counts = {"inserted": 0, "updated": 0}
+        written = []
+        keys = list(merged)
         try:
-            existing = self.session.execute(
-                select(BusinessTerm).where(
-                    BusinessTerm.term == term_data["term"],
-                    BusinessTerm.term_context == term_data.get("term_context")
-                )
-            ).scalars().first()
-
-            if existing:
-                # Update existing fields if new info is available
-                for key, value in term_data.items():
-                    if value is not None and hasattr(existing, key):
-                        setattr(existing, key, value)
-                existing.version += 1
-                print(f"Updated existing term: {existing.term}")
-            else:
-                # Insert new term
-                new_term = BusinessTerm(**term_data)
-                self.session.add(new_term)
-                print(f"Inserted new term: {term_data['term']}")
+            for i in range(0, len(keys), chunk_size):
+                chunk = keys[i:i + chunk_size]
+                existing = {
+                    row.term_key: row
+                    for row in self.session.execute(
+                        select(BusinessTerm.id, BusinessTerm.term_key, BusinessTerm.version)
+                        .where(BusinessTerm.term_key.in_(chunk))
+                    )
+                }
+
+                inserts, updates = [], []
+                for key in chunk:
+                    fields, upserts = merged[key]
+                    row = existing.get(key)
+                    if row is None:
+                        inserts.append({**fields, "term_key": key, "version": upserts})
+                    elif update_existing:
+                        # Update existing fields if new info is available
+                        values = {k: v for k, v in fields.items() if v is not None}
+                        updates.append({**values, "id": row.id, "version": (row.version or 1) + upserts})
+                    else:
+                        continue
+                    written.append(fields["term"])
+
+                if inserts:
+                    # executemany over insert() is sent as multi-row INSERT statements
+                    self.session.execute(insert(BusinessTerm), inserts)
+                if updates:
+                    # Bulk UPDATE by primary key, grouped by the set of columns given
+                    self.session.execute(update(BusinessTerm), updates)
+                counts["inserted"] += len(inserts)
+                counts["updated"] += len(updates)
 
             self.session.commit()
 
         except SQLAlchemyError as e:
             self.session.rollback()
             print(f"Database error: {e}")
+            return None
+
+        self._index_reference_terms(written)
+        return counts
+
+    def _index_reference_terms(self, terms):
+        """Append committed terms to the persisted reference embedding index."""
+        if not terms:
+            return
+        try:
+            from services.reference_term_index import get_reference_index
+            get_reference_index().add_terms(terms)
+        except Exception as e:
+            # The index re-syncs from the database on the next extraction run
+            print(f"Reference index update failed: {e}")
 
     def get_all_terms(self):
         """Retrieve all active terms."""
@@ -90,4 +181,8 @@ class BusinessTermRepository:
         return [r[0] for r in result]
 
     def close(self):
-        self.session.close()
+        """Release the session (for the scoped session: the calling thread's)."""
+        if self.session is ScopedSession:
+            ScopedSession.remove()
+        else:
+            self.session.close()
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("spacy")
+
+from extraction import semantic_function
+from extraction.semantic_function import match_semantic_context
+
+VOCAB = ["loan", "rate", "deposit", "account", "branch", "card", "fee"]
+# Embedded like "loan" without sharing its lemma
+SYNONYMS = {"mortgage": "loan"}
+
+
+def fake_encode(texts):
+    vectors = np.zeros((len(texts), len(VOCAB)), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            word = SYNONYMS.get(word, word)
+            if word in VOCAB:
+                vectors[row, VOCAB.index(word)] += 1.0
+    return vectors
+
+
+@pytest.fixture(autouse=True)
+def fake_models(monkeypatch):
+    monkeypatch.setattr(semantic_function, "encode_texts", fake_encode)
+    monkeypatch.setattr(semantic_function, "lemmatize_terms", lambda terms: [t.lower().split() for t in terms])
+
+
+PARAGRAPHS = [
+    {"original_sentence": sentence, "lemmatized_sentence": sentence.lower(), "tokens": sentence.lower().split()}
+    for sentence in ["loan rate", "deposit account", "branch", "card fee", "loan"]
+]
+
+
+def contexts_of(term, batch):
+    matched = match_semantic_context([{"term": t} for t in batch], PARAGRAPHS, threshold=0.1, shortlist_size=2)
+    return next((t["contexts"] for t in matched if t["term"] == term), None)
+
+
+def test_term_result_does_not_depend_on_the_batch():
+    for term in ("mortgage", "loan rate"):
+        assert contexts_of(term, ["mortgage", "loan rate"]) == contexts_of(term, [term, "deposit account"])
+
+
+def test_term_without_shared_lemma_gets_no_context():
+    assert contexts_of("mortgage", ["mortgage", "loan rate"]) is None
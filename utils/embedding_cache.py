@@ -0,0 +1,191 @@
+"""
+Two-tier cache for sentence embeddings, keyed by (model name, normalized text).
+
+Tier 1 is an in-memory LRU of recently used vectors. Tier 2 is an append-only
+float32 matrix on disk, read through np.memmap, with a small key file mapping
+text hashes to rows. Only texts missing from both tiers reach the encoder.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.constants import SENTENCE_MODEL, EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_MEMORY_ITEMS
+from utils.model_registry import get_sentence_model
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are still serialized within the process
+    fcntl = None
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache lookups (outer and repeated whitespace)."""
+    return re.sub(r"\s+", " ", (text or "").strip())
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, model_name=SENTENCE_MODEL, cache_dir=EMBEDDING_CACHE_DIR,
+                 memory_items=EMBEDDING_CACHE_MEMORY_ITEMS):
+        self.model_name = model_name
+        self.memory_items = memory_items
+        self.dir = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+        self.vectors_path = os.path.join(self.dir, "vectors.f32")
+        self.keys_path = os.path.join(self.dir, "keys.tsv")
+        self.meta_path = os.path.join(self.dir, "meta.json")
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._rows = {}
+        self._dim = None
+        self._mmap = None
+        self._mapped_rows = 0
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.encode_seconds = 0.0
+
+        self._load_index()
+
+    # --- Disk tier ---
+    def _load_index(self):
+        if not os.path.exists(self.meta_path):
+            return
+        with open(self.meta_path) as f:
+            self._dim = json.load(f)["dim"]
+
+        row_bytes = self._dim * 4
+        total_rows = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path) as f:
+                for line in f:
+                    key, _, row = line.rstrip("\n").partition("\t")
+                    # Ignore keys whose vector write did not complete
+                    if row.isdigit() and int(row) < total_rows:
+                        self._rows[key] = int(row)
+
+    def _disk_vector(self, row):
+        if self._mmap is None or row >= self._mapped_rows:
+            total_rows = os.path.getsize(self.vectors_path) // (self._dim * 4)
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                   shape=(total_rows, self._dim))
+            self._mapped_rows = total_rows
+        return np.array(self._mmap[row])
+
+    def _append_to_disk(self, keys, vectors):
+        os.makedirs(self.dir, exist_ok=True)
+        if self._dim is None:
+            self._dim = int(vectors.shape[1])
+            with open(self.meta_path, "w") as f:
+                json.dump({"model": self.model_name, "dim": self._dim}, f)
+
+        with open(self.keys_path, "a") as keys_file:
+            if fcntl:
+                fcntl.flock(keys_file, fcntl.LOCK_EX)
+            try:
+                with open(self.vectors_path, "ab") as vec_file:
+                    first_row = vec_file.tell() // (self._dim * 4)
+                    vec_file.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+                keys_file.write("".join(f"{k}\t{first_row + i}\n" for i, k in enumerate(keys)))
+            finally:
+                if fcntl:
+                    fcntl.flock(keys_file, fcntl.LOCK_UN)
+
+        for i, k in enumerate(keys):
+            self._rows[k] = first_row + i
+
+    # --- Memory tier ---
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def encode(self, texts, batch_size=64):
+        """
+        Return embeddings for `texts` as a float32 array (len(texts) x dim),
+        encoding only the texts not found in either cache tier.
+        """
+        texts = list(texts)
+        keys = [_text_key(t) for t in texts]
+        found = {}
+        missing = {}
+
+        with self._lock:
+            for key, text in zip(keys, texts):
+                if key in found or key in missing:
+                    continue
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                    self.hits_memory += 1
+                elif key in self._rows:
+                    vector = self._disk_vector(self._rows[key])
+                    self._remember(key, vector)
+                    found[key] = vector
+                    self.hits_disk += 1
+                else:
+                    missing[key] = normalize_text(text)
+                    self.misses += 1
+
+        if missing:
+            start = time.perf_counter()
+            model = get_sentence_model(self.model_name)
+            new_vectors = model.encode(list(missing.values()), batch_size=batch_size,
+                                       convert_to_numpy=True, show_progress_bar=False).astype(np.float32)
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self.encode_seconds += elapsed
+                self._append_to_disk(list(missing.keys()), new_vectors)
+                for key, vector in zip(missing.keys(), new_vectors):
+                    self._remember(key, vector)
+                    found[key] = vector
+
+        if not texts:
+            return np.zeros((0, self._dim or 0), dtype=np.float32)
+        return np.stack([found[k] for k in keys])
+
+    def stats(self):
+        lookups = self.hits_memory + self.hits_disk + self.misses
+        return {
+            "model": self.model_name,
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "hit_rate": round((self.hits_memory + self.hits_disk) / lookups, 3) if lookups else 0.0,
+            "encode_seconds": round(self.encode_seconds, 3),
+            "disk_entries": len(self._rows),
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name: str = SENTENCE_MODEL) -> EmbeddingCache:
+    """Return the process-wide cache for `model_name`."""
+    with _caches_lock:
+        if model_name not in _caches:
+            _caches[model_name] = EmbeddingCache(model_name)
+        return _caches[model_name]
+
+
+def encode_texts(texts, model_name: str = SENTENCE_MODEL, batch_size=64):
+    """Encode texts with the shared sentence model through the embedding cache."""
+    return get_embedding_cache(model_name).encode(texts, batch_size=batch_size)
+
+
+def get_embedding_cache_stats():
+    """Hit/miss counters for every embedding cache used in this process."""
+    with _caches_lock:
+        return [c.stats() for c in _caches.values()]
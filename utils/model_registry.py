@@ -0,0 +1,95 @@
+"""
+Process-wide registry for the heavy NLP models.
+
+spaCy pipelines and SentenceTransformer encoders are loaded lazily on first
+use, exactly once per process, and shared by every module that needs them.
+"""
+import threading
+import time
+
+from utils.constants import SENTENCE_MODEL, NLP_MODEL_LARGE
+
+_lock = threading.Lock()
+_models = {}
+_stats = {}
+
+
+def _resident_memory_bytes():
+    """Return the current resident set size of this process (0 if unknown)."""
+    try:
+        import os
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in KiB elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, AttributeError):
+        return 0
+
+
+def _get_or_load(kind, name, loader):
+    key = (kind, name)
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _lock:
+        # Another thread may have finished loading while we waited
+        model = _models.get(key)
+        if model is not None:
+            return model
+
+        rss_before = _resident_memory_bytes()
+        start = time.perf_counter()
+        model = loader(name)
+        elapsed = time.perf_counter() - start
+        rss_after = _resident_memory_bytes()
+
+        _models[key] = model
+        _stats[key] = {
+            "kind": kind,
+            "name": name,
+            "load_seconds": round(elapsed, 3),
+            "resident_bytes": max(rss_after - rss_before, 0),
+        }
+        print(f"Loaded {kind} model '{name}' in {elapsed:.2f}s "
+              f"(+{_stats[key]['resident_bytes'] / 2**20:.0f} MiB resident)")
+        return model
+
+
+def _load_spacy(name):
+    import spacy
+    return spacy.load(name)
+
+
+def _load_sentence_transformer(name):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name)
+
+
+def get_nlp(name: str = NLP_MODEL_LARGE):
+    """Return the shared spaCy pipeline for `name`, loading it on first use."""
+    return _get_or_load("spacy", name, _load_spacy)
+
+
+def get_sentence_model(name: str = SENTENCE_MODEL):
+    """Return the shared SentenceTransformer for `name`, loading it on first use."""
+    return _get_or_load("sentence_transformer", name, _load_sentence_transformer)
+
+
+def get_model_stats():
+    """
+    Report the models loaded in this process.
+
+    Returns:
+        list[dict]: one entry per model with kind, name, load_seconds and
+        resident_bytes (RSS growth observed while loading).
+    """
+    with _lock:
+        return [dict(s) for s in _stats.values()]
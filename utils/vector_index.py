@@ -0,0 +1,194 @@
+"""
+Nearest-neighbour search over unit-normalized embedding matrices.
+
+Two backends share one interface, `search(queries) -> (best_idx, best_score)`:
+
+- ExactVectorIndex: brute-force inner product, chunked so the score matrix
+  never exceeds a memory budget. Always returns the true best match.
+- IVFVectorIndex: inverted-file index. Vectors are clustered with spherical
+  k-means; a query is only compared with the vectors of the `n_probe`
+  clusters whose centroids are closest to it. Runs on CPU with numpy only.
+
+The backend is chosen with VECTOR_INDEX_BACKEND ("exact" or "ivf");
+measure_recall reports how often the approximate backend finds the same
+best match as the exact one.
+"""
+import numpy as np
+
+from utils.constants import (
+    VECTOR_INDEX_BACKEND,
+    VECTOR_INDEX_MIN_APPROX_ROWS,
+    IVF_N_LISTS,
+    IVF_N_PROBE,
+)
+
+
+def _empty_result(n):
+    return np.zeros(n, dtype=np.int64), np.full(n, -1.0, dtype=np.float32)
+
+
+class ExactVectorIndex:
+    """Brute-force inner-product search (cosine on unit vectors)."""
+
+    backend = "exact"
+
+    def __init__(self, vectors, max_chunk_bytes=256 * 2**20):
+        self.vectors = vectors
+        self.max_chunk_bytes = max_chunk_bytes
+
+    def __len__(self):
+        return 0 if self.vectors is None else self.vectors.shape[0]
+
+    def search(self, queries):
+        n = queries.shape[0]
+        best_idx, best_score = _empty_result(n)
+        if not len(self) or n == 0:
+            return best_idx, best_score
+
+        chunk = max(1, self.max_chunk_bytes // (4 * len(self)))
+        for start in range(0, n, chunk):
+            sims = queries[start:start + chunk] @ self.vectors.T
+            idx = sims.argmax(axis=1)
+            best_idx[start:start + chunk] = idx
+            best_score[start:start + chunk] = sims[np.arange(len(idx)), idx]
+        return best_idx, best_score
+
+
+def _assign(vectors, centroids, chunk_rows=65536):
+    """Index of the closest centroid for every row, in chunks."""
+    assignments = np.empty(vectors.shape[0], dtype=np.int32)
+    for start in range(0, vectors.shape[0], chunk_rows):
+        block = np.asarray(vectors[start:start + chunk_rows], dtype=np.float32)
+        assignments[start:start + chunk_rows] = (block @ centroids.T).argmax(axis=1)
+    return assignments
+
+
+def train_centroids(vectors, n_lists, iterations=10, sample_per_list=64, seed=0):
+    """Spherical k-means on a sample of `vectors`; returns (n_lists x dim) unit centroids."""
+    rng = np.random.default_rng(seed)
+    n = vectors.shape[0]
+    sample_size = min(n, n_lists * sample_per_list)
+    sample = np.asarray(vectors[np.sort(rng.choice(n, sample_size, replace=False))], dtype=np.float32)
+
+    centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        counts = np.bincount(assignments, minlength=n_lists)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty clusters with random sample points
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+class IVFVectorIndex:
+    """
+    Approximate inner-product search with an inverted file.
+
+    Rows are grouped by their closest centroid; a query scans only the
+    rows of its `n_probe` closest lists. Recall grows with n_probe, cost
+    with n_probe / n_lists of the exact scan.
+    """
+
+    backend = "ivf"
+
+    def __init__(self, vectors, centroids=None, assignments=None, n_lists=None, n_probe=IVF_N_PROBE, seed=0):
+        self.vectors = vectors
+        self.n_probe = n_probe
+        n = vectors.shape[0]
+        if centroids is None:
+            n_lists = n_lists or IVF_N_LISTS or max(1, int(np.sqrt(n)))
+            centroids = train_centroids(vectors, min(n_lists, n), seed=seed)
+        self.centroids = centroids
+
+        if assignments is None:
+            assignments = _assign(vectors, centroids)
+        elif len(assignments) < n:
+            # Rows appended since the assignments were saved
+            tail = _assign(vectors[len(assignments):], centroids)
+            assignments = np.concatenate([assignments, tail])
+        self.assignments = assignments[:n]
+
+        # Row ids grouped by list: list l holds order[offsets[l]:offsets[l + 1]]
+        self.order = np.argsort(self.assignments, kind="stable")
+        self.offsets = np.searchsorted(self.assignments[self.order], np.arange(len(centroids) + 1))
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    @property
+    def n_lists(self):
+        return self.centroids.shape[0]
+
+    def search(self, queries):
+        n = queries.shape[0]
+        best_idx, best_score = _empty_result(n)
+        if not len(self) or n == 0:
+            return best_idx, best_score
+        best_score[:] = -np.inf
+
+        n_probe = min(self.n_probe, self.n_lists)
+        centroid_sims = queries @ self.centroids.T
+        if n_probe < self.n_lists:
+            probes = np.argpartition(-centroid_sims, n_probe - 1, axis=1)[:, :n_probe]
+        else:
+            probes = np.broadcast_to(np.arange(self.n_lists), (n, self.n_lists))
+
+        # Visit each probed list once, with every query that probes it
+        probe_rows = np.repeat(np.arange(n), n_probe)
+        probe_lists = probes.ravel()
+        by_list = np.argsort(probe_lists, kind="stable")
+        list_bounds = np.searchsorted(probe_lists[by_list], np.arange(self.n_lists + 1))
+
+        for lst in range(self.n_lists):
+            q = probe_rows[by_list[list_bounds[lst]:list_bounds[lst + 1]]]
+            members = self.order[self.offsets[lst]:self.offsets[lst + 1]]
+            if not len(q) or not len(members):
+                continue
+            sims = queries[q] @ np.asarray(self.vectors[members], dtype=np.float32).T
+            idx = sims.argmax(axis=1)
+            scores = sims[np.arange(len(q)), idx]
+            better = scores > best_score[q]
+            best_score[q[better]] = scores[better]
+            best_idx[q[better]] = members[idx[better]]
+
+        # Queries whose probed lists were all empty keep the exact-search default
+        best_score[np.isneginf(best_score)] = -1.0
+        return best_idx, best_score
+
+
+def select_backend(n_rows, backend=None):
+    """
+    Backend used for a matrix of `n_rows` rows. Matrices smaller than
+    VECTOR_INDEX_MIN_APPROX_ROWS always use exact search; at that size the
+    scan is cheap and clustering only loses recall.
+    """
+    backend = backend or VECTOR_INDEX_BACKEND
+    if backend not in ("exact", "ivf"):
+        raise ValueError(f"Unknown vector index backend: {backend}")
+    return "exact" if n_rows < VECTOR_INDEX_MIN_APPROX_ROWS else backend
+
+
+def build_vector_index(vectors, backend=None, **kwargs):
+    """Build the configured index over `vectors` (see select_backend)."""
+    if vectors is None or select_backend(vectors.shape[0], backend) == "exact":
+        return ExactVectorIndex(vectors)
+    return IVFVectorIndex(vectors, **kwargs)
+
+
+def measure_recall(index, queries, exact_index=None):
+    """
+    Recall@1 of `index` against exact search: the share of queries for which
+    it returns the same best match (or one scoring as high).
+    """
+    if len(queries) == 0:
+        return 1.0
+    exact_index = exact_index or ExactVectorIndex(index.vectors)
+    _, exact_scores = exact_index.search(queries)
+    _, approx_scores = index.search(queries)
+    return float(np.mean(approx_scores >= exact_scores - 1e-6))